@@ -3,6 +3,7 @@ from typing import Dict, Any, Optional, List
 from fastapi import APIRouter, Depends, UploadFile, File, Form, Body
 from src.application.handlers.assets.image_handler import get_image_handler, ImageHandler
 from src.schemas.dtos.response.base_response import BaseResponse
+from src.infrastructure.utils.response_utils import FastJSONResponse
 
 router = APIRouter(prefix="/image", tags=["Image Generation"])
 
@@ -156,8 +157,9 @@ async def generate_complete_game_json(
 # ================================================================
 # 文件上传模式路由 - 用于 reference_assets 和艺术风格参考图
 # ================================================================
+# 结果中带有资产参考文件的解析数据，嵌套深、体积大，用FastJSONResponse编码
 
-@router.post("/{module}/generate-with-files", summary="单模块图像生成 (文件上传模式)")
+@router.post("/{module}/generate-with-files", summary="单模块图像生成 (文件上传模式)", response_class=FastJSONResponse)
 async def generate_single_module_with_files(
     module: str,
     # 基础参数
@@ -228,7 +230,7 @@ async def generate_single_module_with_files(
     except Exception as e:
         return BaseResponse.error_response("GENERATION_ERROR", str(e))
 
-@router.post("/generate-complete-with-files", summary="完整游戏资产生成 (文件上传模式)")
+@router.post("/generate-complete-with-files", summary="完整游戏资产生成 (文件上传模式)", response_class=FastJSONResponse)
 async def generate_complete_game_with_files(
     # 全局配置
     global_style: str = Form(..., description="全局艺术风格配置的JSON字符串"),
@@ -110,8 +110,8 @@ async def get_model_info(
         model_info = {
             "model": model,
             "capabilities": model_capabilities[model],
-            "examples": handler.audio_service.get_model_examples(model),
-            "limits": handler.audio_service.get_generation_limits(),
+            "examples": dict(handler.audio_service.get_model_examples(model)),
+            "limits": dict(handler.audio_service.get_generation_limits()),
             "service_info": service_info
         }
         
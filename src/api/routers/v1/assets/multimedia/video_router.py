@@ -98,8 +98,8 @@ async def get_model_info(
         model_info = {
             "model": model,
             "capabilities": model_capabilities[model],
-            "examples": handler.video_service.get_model_examples(model),
-            "limits": handler.video_service.get_generation_limits(),
+            "examples": dict(handler.video_service.get_model_examples(model)),
+            "limits": dict(handler.video_service.get_generation_limits()),
             "service_info": service_info
         }
         
@@ -114,7 +114,7 @@ async def get_supported_formats(
 ):
     """获取支持的视频格式和规格"""
     try:
-        formats_info = handler.video_service.get_supported_formats()
+        formats_info = dict(handler.video_service.get_supported_formats())
         return BaseResponse.success_response(formats_info)
     except Exception as e:
         return BaseResponse.error_response("FORMATS_ERROR", str(e))
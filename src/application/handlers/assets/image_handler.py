@@ -24,7 +24,8 @@ from src.schemas.dtos.request.image_request import (
     UIGenerationInput, 
     BackgroundsGenerationInput,
     ArtStyleConfig,
-    ImageAssetItem
+    ImageAssetItem,
+    GENERATION_INPUT_CLASSES
 )
 
 class ImageHandler(BaseHandler):
@@ -263,16 +264,15 @@ class ImageHandler(BaseHandler):
         service = self._get_service(module)
         
         # 创建参数对象
-        param_classes = {
-            "symbols": SymbolsGenerationInput, 
-            "ui": UIGenerationInput, 
-            "backgrounds": BackgroundsGenerationInput
-        }
-        param_class = param_classes.get(module)
+        param_class = GENERATION_INPUT_CLASSES.get(module)
         if not param_class:
             raise ValueError(f"不支持的模块: {module}")
         
-        gen_params = param_class(**generation_params)
+        # 内部转发的已验证参数对象直接使用，原始字典走完整校验
+        if isinstance(generation_params, param_class):
+            gen_params = generation_params
+        else:
+            gen_params = param_class(**generation_params)
         
         # 验证
         if model not in service.get_available_models():
@@ -475,23 +475,6 @@ class ImageHandler(BaseHandler):
             # 准备推理参数（包括参考图片）
             inference_params = service.prepare_inference_params(base_prompt, task_info, reference_data)
             
-            # 如果是参考文件模式，添加参考图片URL
-            if request_data["generation_mode"] == "reference_assets" and reference_data.get("image_urls"):
-                reference_image_urls = file_processing_service.get_reference_image_urls_for_task(
-                    task_info, reference_data["image_urls"]
-                )
-                if reference_image_urls:
-                    # 使用OpenAI service支持的image_urls参数
-                    if len(reference_image_urls) == 1:
-                        inference_params["image_url"] = reference_image_urls[0]
-                    else:
-                        inference_params["image_urls"] = reference_image_urls
-                    
-                    self.logger.info(f"添加参考图片到推理: {len(reference_image_urls)}张", extra={
-                        "task_filename": task_info.get("filename"),
-                        "image_count": len(reference_image_urls)
-                    })
-            
             # 执行推理
             provider_name = request_data["provider"] or self.asset_settings.get_module_default_provider(request_data["module"])
             
@@ -818,17 +801,17 @@ class ImageHandler(BaseHandler):
     async def get_module_info(self, module: str) -> Dict[str, Any]:
         """获取模块信息"""
         service = self._get_service(module)
-        service_info = service.get_service_info()
         
-        # 添加艺术风格支持信息
+        # 添加艺术风格支持信息（服务信息是共享的缓存字典，合并到新字典中返回）
         art_style_info = await self.art_style_handler.handle_get_available_presets()
-        service_info["art_style_support"] = {
-            "available_modes": ["preset", "custom_direct", "custom_ai_enhanced", "reference_image"],
-            "available_presets": list(art_style_info.get("presets", {}).keys()),
-            "ai_models_supported": art_style_info.get("ai_models", {})
+        return {
+            **service.get_service_info(),
+            "art_style_support": {
+                "available_modes": ["preset", "custom_direct", "custom_ai_enhanced", "reference_image"],
+                "available_presets": list(art_style_info.get("presets", {}).keys()),
+                "ai_models_supported": art_style_info.get("ai_models", {})
+            }
         }
-        
-        return service_info
     
     async def get_config_examples(self) -> Dict[str, Any]:
         """获取配置示例"""
@@ -1,5 +1,6 @@
 # src/application/handlers/foo_handler.py
 import asyncio
+import time
 from typing import Any, Dict, Optional
 from src.application.handlers.handler_interface import BaseHandler
 from src.application.services.foo_service import get_foo_service
@@ -73,7 +74,7 @@ class FooHandler(BaseHandler[Dict[str, Any]]):
                 **result,
                 "handler": "FooHandler",
                 "flow": "async_processing",
-                "request_processed_at": asyncio.get_event_loop().time()
+                "request_processed_at": asyncio.get_running_loop().time()
             }
             
             self.logger.info("异步处理流程完成", extra={
@@ -134,7 +135,8 @@ class FooHandler(BaseHandler[Dict[str, Any]]):
                 **result,
                 "handler": "FooHandler", 
                 "flow": "sync_processing",
-                "request_processed_at": asyncio.get_event_loop().time()
+                # 同步路径可能在没有运行中事件循环的线程里调用；默认事件循环的time()即time.monotonic()
+                "request_processed_at": time.monotonic()
             }
             
             self.logger.info("同步处理流程完成", extra={
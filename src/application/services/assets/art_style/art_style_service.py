@@ -421,7 +421,7 @@ class ArtStyleService(BaseService):
                 file_name = original_name
             
             # 使用事件循环运行同步上传方法（不设置ACL）
-            loop = asyncio.get_event_loop()
+            loop = asyncio.get_running_loop()
             upload_result = await loop.run_in_executor(
                 None,
                 lambda: s3_service.upload_file_sync(
@@ -461,7 +461,7 @@ class ArtStyleService(BaseService):
         """清理临时图像 - 使用同步方法"""
         try:
             # 使用事件循环运行同步删除方法
-            loop = asyncio.get_event_loop()
+            loop = asyncio.get_running_loop()
             success = await loop.run_in_executor(
                 None,
                 s3_service.delete_file,
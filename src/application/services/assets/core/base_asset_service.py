@@ -111,7 +111,7 @@ class BaseAssetService(BaseService, ABC):
                 "status": "healthy" if available_models else "degraded",
                 "available_models": available_models,
                 "default_provider": default_provider,
-                "generation_limits": generation_limits,
+                "generation_limits": dict(generation_limits),
                 "timestamp": self._get_current_time()
             }
         except Exception as e:
@@ -1,10 +1,12 @@
 # src/application/services/assets/image/backgrounds_service.py (简化版 - 清晰的提示词构建)
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Tuple
 from .base_image_service import BaseImageService
 
 class BackgroundsService(BaseImageService):
     """背景生成服务 - 使用Art Style模块，专注于背景相关的提示词构建"""
     
+    _CATEGORY_NAMES = ("background_set",)
+    
     def get_module_name(self) -> str:
         return "backgrounds"
     
@@ -14,8 +16,8 @@ class BackgroundsService(BaseImageService):
             "The background should be atmospheric, immersive, and suitable for online slot machine games."
         )
     
-    def _get_category_names(self) -> List[str]:
-        return ["background_set"]
+    def _get_category_names(self) -> Tuple[str, ...]:
+        return self._CATEGORY_NAMES
     
     def build_content_prompt(self, task_info: Dict[str, Any], art_style_data: Dict[str, Any]) -> str:
         """构建背景相关的内容提示词"""
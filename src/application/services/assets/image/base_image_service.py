@@ -1,7 +1,8 @@
 # src/application/services/assets/image/base_image_service.py (重构版 - 移除hardcode风格，保留提示词构建)
+import asyncio
 import uuid
 import base64
-from typing import Dict, Any, List, Optional, Tuple
+from typing import ClassVar, Dict, Any, List, Optional, Tuple
 from abc import ABC, abstractmethod
 from datetime import datetime
 
@@ -10,9 +11,13 @@ from src.application.config.assets.asset_settings import get_asset_settings
 from src.application.services.external.ai_service_factory import ai_service_factory
 from src.application.services.external.s3_service import s3_service
 
+
 class BaseImageService(BaseAssetService, ABC):
     """图像生成服务基类 - 移除hardcode风格，依赖Art Style模块，保留提示词构建"""
     
+    # get_service_info的缓存，按服务类保存：处理器每个请求都会新建服务实例，而配置在进程内不变
+    _service_info_cache: ClassVar[Dict[type, Dict[str, Any]]] = {}
+    
     def __init__(self):
         super().__init__()
         self.asset_settings = get_asset_settings()
@@ -29,8 +34,8 @@ class BaseImageService(BaseAssetService, ABC):
         pass
     
     @abstractmethod
-    def _get_category_names(self) -> List[str]:
-        """获取模块支持的category名称列表"""
+    def _get_category_names(self) -> Tuple[str, ...]:
+        """获取模块支持的category名称（子类返回共享的元组常量）"""
         pass
     
     @abstractmethod
@@ -52,7 +57,17 @@ class BaseImageService(BaseAssetService, ABC):
         return self.get_module_name()
     
     def get_service_info(self) -> Dict[str, Any]:
-        """实现基类要求的get_service_info方法"""
+        """实现基类要求的get_service_info方法 - 每个服务类首次调用时查询配置并缓存
+        
+        返回的是共享字典，调用方需要补充字段时应构建新字典，不要修改返回值
+        """
+        service_info = self._service_info_cache.get(type(self))
+        if service_info is None:
+            service_info = self._service_info_cache[type(self)] = self._build_service_info()
+        return service_info
+    
+    def _build_service_info(self) -> Dict[str, Any]:
+        """构建服务信息字典"""
         available_models = self.asset_settings.get_all_available_ai_models()
         
         return {
@@ -131,29 +146,7 @@ class BaseImageService(BaseAssetService, ABC):
         tasks = []
         
         for subcategory_name, items in category_data.items():
-            for item in items:
-                # 支持字典格式的元件
-                if isinstance(item, dict):
-                    filename = item.get("filename")
-                    description = item.get("description", filename)
-                    count = item.get("count", 1)
-                    resolution = item.get("resolution", default_resolution)
-                else:
-                    # 兼容旧格式
-                    self.logger.warning(f"使用已弃用的元件格式，请更新为新的字典格式: {item}")
-                    continue
-                
-                for index in range(1, count + 1):
-                    task_info = {
-                        "category": category_name,
-                        "subcategory": subcategory_name,
-                        "filename": filename,
-                        "description": description,
-                        "index": index,
-                        "resolution": resolution,
-                        "format_version": "new"
-                    }
-                    tasks.append(task_info)
+            tasks.extend(self._expand_items(category_name, subcategory_name, items, default_resolution))
         
         return tasks
     
@@ -162,26 +155,39 @@ class BaseImageService(BaseAssetService, ABC):
         tasks = []
         
         for custom_category, items in custom_content.items():
-            for item in items:
-                if isinstance(item, dict):
-                    filename = item.get("filename")
-                    description = item.get("description", filename)
-                    count = item.get("count", 1)
-                    resolution = item.get("resolution", default_resolution)
-                else:
-                    continue
-                
-                for index in range(1, count + 1):
-                    task_info = {
-                        "category": "custom",
-                        "subcategory": custom_category,
-                        "filename": filename,
-                        "description": description,
-                        "index": index,
-                        "resolution": resolution,
-                        "format_version": "new"
-                    }
-                    tasks.append(task_info)
+            tasks.extend(self._expand_items("custom", custom_category, items, default_resolution))
+        
+        return tasks
+    
+    def _expand_items(self, category: str, subcategory: str, items: List[Dict[str, Any]], default_resolution: str) -> List[Dict[str, Any]]:
+        """把分类下的元件展开为任务列表（每个元件按count展开），旧格式元件汇总警告后跳过"""
+        tasks = []
+        deprecated_count = 0
+        
+        for item in items:
+            if not isinstance(item, dict):
+                # 兼容旧格式 - 逐项仅在DEBUG级别输出，%格式化在级别过滤后才执行
+                deprecated_count += 1
+                self.logger.debug("使用已弃用的元件格式，请更新为新的字典格式: %s", item)
+                continue
+            
+            filename = item.get("filename")
+            description = item.get("description", filename)
+            count = item.get("count", 1)
+            resolution = item.get("resolution", default_resolution)
+            for index in range(1, count + 1):
+                tasks.append({
+                    "category": category,
+                    "subcategory": subcategory,
+                    "filename": filename,
+                    "description": description,
+                    "index": index,
+                    "resolution": resolution,
+                    "format_version": "new"
+                })
+        
+        if deprecated_count:
+            self.logger.warning("%s/%s: %d 个元件使用已弃用的格式，请更新为新的字典格式", category, subcategory, deprecated_count)
         
         return tasks
     
@@ -210,28 +216,26 @@ class BaseImageService(BaseAssetService, ABC):
         components = art_style_data.get("components", {})
         quality_tags = art_style_data.get("quality_tags", "high quality, professional design")
         
-        # 构建完整提示词
-        prompt_parts = [
-            content_prompt,  # 子类提供的内容描述
-            f"Art style: {style_prompt}",  # Art Style模块提供的完整风格
-            f"Category: {task_info['category']}, Subcategory: {task_info['subcategory']}"
-        ]
-        
-        # 添加参考信息
+        # 添加参考信息（可选段，预先拼接为后缀）
+        ref_suffix = ""
         if reference_data:
-            if reference_data.get("asset_description"):
-                prompt_parts.append(f"Reference: {reference_data['asset_description']}")
-            if reference_data.get("reference_prompt"):
-                prompt_parts.append(f"Asset reference: {reference_data['reference_prompt']}")
+            asset_description = reference_data.get("asset_description")
+            if asset_description:
+                ref_suffix += f", Reference: {asset_description}"
+            reference_prompt = reference_data.get("reference_prompt")
+            if reference_prompt:
+                ref_suffix += f", Asset reference: {reference_prompt}"
         
-        # 添加技术要求和质量标签
+        # 构建完整提示词 - 固定段直接拼接，避免中间列表
         resolution = task_info.get("resolution", "1024x1024")
-        prompt_parts.extend([
-            f"Technical specs: {resolution} resolution, isolated on transparent background",
+        return (
+            f"{content_prompt}, "
+            f"Art style: {style_prompt}, "
+            f"Category: {task_info['category']}, Subcategory: {task_info['subcategory']}"
+            f"{ref_suffix}, "
+            f"Technical specs: {resolution} resolution, isolated on transparent background, "
             f"Quality: {quality_tags}"
-        ])
-        
-        return ", ".join(prompt_parts)
+        )
     
     # === 参考图片处理方法 ===
     
@@ -291,22 +295,27 @@ class BaseImageService(BaseAssetService, ABC):
             base_prompt = generation_params.get('prompt', f"Create {num_outputs} high-quality {self.get_module_name()} assets")
             
             ai_service = ai_service_factory.get_service(actual_provider)
+            inference_params = {
+                "prompt": base_prompt,
+                "size": generation_params.get('resolution', '1024x1024'),
+                "quality": "standard"
+            }
+            
+            # 并发推理，受全局最大并发数限制
+            semaphore = asyncio.Semaphore(self.asset_settings.get_max_concurrent_generations())
             
-            results = []
-            for i in range(num_outputs):
-                try:
-                    inference_params = {
-                        "prompt": base_prompt,
-                        "size": generation_params.get('resolution', '1024x1024'),
-                        "quality": "standard"
-                    }
-                    result = await ai_service.run_inference(resolved_model, inference_params)
-                    results.append(result if isinstance(result, str) else str(result))
-                except Exception as e:
-                    self.logger.error(f"生成第{i+1}个输出失败: {str(e)}")
-                    continue
+            async def _run_one(output_index: int) -> Optional[str]:
+                async with semaphore:
+                    try:
+                        result = await ai_service.run_inference(resolved_model, dict(inference_params))
+                        return result if isinstance(result, str) else str(result)
+                    except Exception as e:
+                        self.logger.error(f"生成第{output_index + 1}个输出失败: {str(e)}")
+                        return None
             
-            return results
+            # gather按输入顺序返回结果，失败的输出记为None后过滤
+            outputs = await asyncio.gather(*(_run_one(i) for i in range(num_outputs)))
+            return [result for result in outputs if result is not None]
         except Exception as e:
             self.logger.error(f"简化生成失败: {str(e)}")
             raise
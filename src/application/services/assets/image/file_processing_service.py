@@ -1,18 +1,151 @@
 # src/application/services/assets/image/file_processing_service.py (增强版 - 添加S3上传和预签名URL)
-import zipfile
+import asyncio
 import io
-import os
-import uuid
-from typing import Dict, Any, List, Optional, Tuple
+import re
+import secrets
+import sys
+import zipfile
+from dataclasses import dataclass, field
+from functools import lru_cache
+from types import MappingProxyType
+from typing import Dict, Any, FrozenSet, List, Mapping, Optional, Tuple, IO
 from fastapi import UploadFile
 
 from src.application.services.service_interface import BaseService
 from src.application.config.assets.asset_settings import get_asset_settings
 from src.application.services.external.s3_service import s3_service
 
+# 文件名解析用的预编译正则
+_RES_RE = re.compile(r'(\d+x\d+)')
+_TRAIL_RES_RE = re.compile(r'_\d+x\d+$')
+_TRAIL_NUM_RE = re.compile(r'_\d+$')
+
+# 各模块参考提示词的基础模板
+_BASE_PROMPT_TEMPLATES = MappingProxyType({
+    "symbols": "Create a slot machine symbol for {description}",
+    "ui": "Create a user interface element for {description}",
+    "backgrounds": "Create a background scene for {description}"
+})
+
+
+def _split_ext(name: str) -> Tuple[str, str]:
+    """拆分文件名为(主干, 小写扩展名不含点)，语义同os.path.splitext但避免额外分配"""
+    stem, dot, ext = name.rpartition('.')
+    if not dot or not stem:
+        return name, ''
+    return stem, ext.lower()
+
+
+@lru_cache(maxsize=4096)
+def _describe_filename(filename: str) -> str:
+    """从文件名（不含扩展名）中提取描述信息 - 仅在需要描述时调用，重复的文件名直接命中缓存"""
+    # 移除常见的分辨率模式
+    clean_filename = _TRAIL_RES_RE.sub('', filename)
+    clean_filename = _TRAIL_NUM_RE.sub('', clean_filename)  # 移除末尾数字
+    
+    # 将下划线和连字符替换为空格，转换为更自然的描述
+    description = clean_filename.replace('_', ' ').replace('-', ' ')
+    
+    # 首字母大写
+    description = ' '.join(word.capitalize() for word in description.split())
+    
+    return description if description else filename
+
+
+@dataclass(slots=True)
+class _AssetColumns:
+    """压缩包文件元数据的列式存储 - 每个字段一列，同一下标对应同一文件"""
+    categories: List[str] = field(default_factory=list)
+    subcategories: List[str] = field(default_factory=list)
+    full_filenames: List[str] = field(default_factory=list)
+    paths: List[str] = field(default_factory=list)
+    resolutions: List[Optional[str]] = field(default_factory=list)
+    urls: List[Optional[str]] = field(default_factory=list)
+    # category -> subcategory -> 文件下标列表，保持首次出现顺序
+    groups: Dict[str, Dict[str, List[int]]] = field(default_factory=dict)
+    # category -> 图片文件数量，解析时累计
+    image_counts: Dict[str, int] = field(default_factory=dict)
+    
+    def __len__(self) -> int:
+        return len(self.paths)
+    
+    def append(
+        self,
+        category: str,
+        subcategory: str,
+        full_filename: str,
+        path: str,
+        resolution: Optional[str],
+        is_image: bool
+    ) -> int:
+        """追加一个文件，返回其下标；filename、description与is_image不单独存储，读取时由full_filename推导"""
+        index = len(self.paths)
+        self.categories.append(category)
+        self.subcategories.append(subcategory)
+        self.full_filenames.append(full_filename)
+        self.paths.append(path)
+        self.resolutions.append(resolution)
+        self.urls.append(None)
+        self.groups.setdefault(category, {}).setdefault(subcategory, []).append(index)
+        if is_image:
+            self.image_counts[category] = self.image_counts.get(category, 0) + 1
+        return index
+    
+    def filename(self, index: int) -> str:
+        """去掉扩展名的文件名，作为文件的唯一标识"""
+        return _split_ext(self.full_filenames[index])[0]
+    
+    def description(self, index: int) -> str:
+        """从文件名中提取的描述信息"""
+        return _describe_filename(self.filename(index))
+    
+    def to_asset_structure(self, image_exts: FrozenSet[str]) -> Dict[str, Dict[str, List[Dict[str, Any]]]]:
+        """物化为嵌套字典结构，仅用于返回给调用方"""
+        return {
+            category: {
+                subcategory: [
+                    {
+                        "filename": filename,                  # 作为唯一标识
+                        "full_filename": self.full_filenames[i],  # 完整文件名
+                        "description": _describe_filename(filename),  # 提取的描述
+                        "path": self.paths[i],                 # 完整路径
+                        "resolution": self.resolutions[i],     # 检测到的分辨率
+                        "is_image": file_ext in image_exts,
+                        "count": 1,  # 默认数量
+                        "presigned_url": self.urls[i]          # 预签名URL
+                    }
+                    for i in indices
+                    for filename, file_ext in (_split_ext(self.full_filenames[i]),)
+                ]
+                for subcategory, indices in subcategories.items()
+            }
+            for category, subcategories in self.groups.items()
+        }
+
+
 class FileProcessingService(BaseService):
     """文件处理服务 - 增强版，支持S3上传和预签名URL生成"""
     
+    # 图片扩展名到Content-Type的映射
+    _CONTENT_TYPE_MAP = MappingProxyType({
+        'jpg': 'image/jpeg',
+        'jpeg': 'image/jpeg',
+        'png': 'image/png',
+        'webp': 'image/webp',
+        'bmp': 'image/bmp'
+    })
+    # 视为压缩包的Content-Type
+    _VALID_ARCHIVE_CTYPES = frozenset({
+        'application/zip',
+        'application/x-zip-compressed',
+        'application/octet-stream'
+    })
+    
+    # 预签名URL有效期（秒）
+    _PRESIGN_EXPIRATION = 3600
+    # 流式读取压缩包条目的块大小
+    _ZIP_READ_CHUNK = 65536
+    
     def __init__(self):
         super().__init__()
         self.asset_settings = get_asset_settings()
@@ -20,11 +153,15 @@ class FileProcessingService(BaseService):
         
         # S3路径前缀
         self.s3_prefix = "image_processing_temp"
+        # 图片并发上传上限
+        self.max_concurrent_uploads = 16
         
         # 支持的图像格式
         self.supported_image_formats = ['.jpg', '.jpeg', '.png', '.webp', '.bmp']
+        self._image_exts = frozenset(ext.lstrip('.') for ext in self.supported_image_formats)
         # 支持的压缩格式
         self.supported_archive_formats = ['.zip', '.tar']
+        self._archive_exts = frozenset(ext.lstrip('.') for ext in self.supported_archive_formats)
     
     def get_service_info(self) -> Dict[str, Any]:
         return {
@@ -74,31 +211,37 @@ class FileProcessingService(BaseService):
             if not self._is_valid_archive_file(asset_file):
                 raise ValueError(f"不支持的压缩格式: {asset_file.content_type}")
             
-            # 读取zip文件
-            file_content = await asset_file.read()
+            # 直接使用上传的临时文件句柄，ZipFile按需读取中央目录和条目，避免整包读入内存
+            await asset_file.seek(0)
+            # 以64KB缓冲读取底层文件，减少解压时的小块读调用
+            buffered_file = io.BufferedReader(asset_file.file, buffer_size=self._ZIP_READ_CHUNK)
             
-            # 解析zip结构并上传图片到S3
-            asset_structure, file_mappings, image_urls = await self._parse_zip_structure_with_s3_upload(file_content)
+            try:
+                # 解析zip结构并上传图片到S3
+                columns, file_mappings, image_urls = await self._parse_zip_structure_with_s3_upload(buffered_file)
+            finally:
+                # 解除包装但不关闭底层上传文件，由FastAPI负责关闭
+                buffered_file.detach()
             
             # 生成参考提示词映射
-            reference_prompts = self._generate_reference_prompts_v2(asset_structure, module)
+            reference_prompts = self._generate_reference_prompts_v2(columns, module)
             
             # 转换为新的元件格式
-            asset_items = self._convert_to_asset_items(asset_structure)
+            asset_items = self._convert_to_asset_items(columns)
             
             # 验证结构是否符合预期
-            validation_result = self._validate_asset_structure(asset_structure, module)
+            validation_result = self._validate_asset_structure(columns, module)
             
             result = {
-                "asset_structure": asset_structure,
+                "asset_structure": columns.to_asset_structure(self._image_exts),
                 "reference_prompts": reference_prompts,
                 "file_mappings": file_mappings,
                 "asset_items": asset_items,
                 "image_urls": image_urls,  # 新增：图片预签名URL映射
                 "processing_info": {
-                    "total_files": len([f for files in asset_structure.values() for subfiles in files.values() for f in subfiles]),
+                    "total_files": len(columns),
                     "image_files": len(image_urls),  # 新增：图片文件数量
-                    "categories": list(asset_structure.keys()),
+                    "categories": list(columns.groups),
                     "validation": validation_result,
                     "format_version": "2.1",
                     "supports_new_format": True,
@@ -132,209 +275,190 @@ class FileProcessingService(BaseService):
                 "image_urls": {}
             }
     
-    async def _parse_zip_structure_with_s3_upload(self, zip_content: bytes) -> Tuple[Dict[str, Dict[str, List[Dict[str, Any]]]], Dict[str, str], Dict[str, str]]:
-        """解析zip文件结构并上传图片到S3 - 新增方法"""
-        asset_structure = {}
+    async def _parse_zip_structure_with_s3_upload(self, zip_file: IO[bytes]) -> Tuple[_AssetColumns, Dict[str, str], Dict[str, str]]:
+        """解析zip文件结构并上传图片到S3 - 接收可seek的文件对象，图片条目以流的形式上传，元数据按列存储"""
+        columns = _AssetColumns()
         file_mappings = {}
         image_urls = {}  # 新增：存储图片的预签名URL
+        upload_jobs = []  # 待上传图片: (文件下标, mapping_key, zip_info)
         
         try:
-            with zipfile.ZipFile(io.BytesIO(zip_content), 'r') as zip_ref:
-                file_list = zip_ref.namelist()
-                
-                for file_path in file_list:
-                    if file_path.endswith('/'):  # 跳过目录
+            with zipfile.ZipFile(zip_file, 'r') as zip_ref:
+                for zip_info in zip_ref.infolist():
+                    if zip_info.is_dir():  # 跳过目录
                         continue
                     
-                    # 解析路径: category/subcategory/filename
-                    path_parts = file_path.split('/')
-                    if len(path_parts) >= 3:
-                        category = path_parts[0]
-                        subcategory = path_parts[1]
-                        full_filename = path_parts[-1]
+                    file_path = zip_info.filename
+                    
+                    # 解析路径: category/subcategory/filename，用partition避免每个条目分配列表
+                    category, _, rest = file_path.partition('/')
+                    subcategory, sep, full_filename = rest.partition('/')
+                    if sep:
+                        # 更深的层级只取最后一段作为文件名
+                        full_filename = full_filename.rpartition('/')[2]
+                        # 分类名在大量文件间重复，驻留后各列共享同一字符串对象
+                        category = sys.intern(category)
+                        subcategory = sys.intern(subcategory)
                         
                         # 提取文件名（去掉扩展名）作为filename
-                        filename_without_ext = os.path.splitext(full_filename)[0]
-                        
-                        # 尝试从文件名中提取描述信息
-                        description = self._extract_description_from_filename(filename_without_ext)
-                        
-                        # 检测分辨率（如果文件名包含分辨率信息）
-                        resolution = self._extract_resolution_from_filename(filename_without_ext)
+                        filename_without_ext, file_ext = _split_ext(full_filename)
                         
                         # 检查是否为图片文件
-                        is_image = self._is_image_file_by_extension(full_filename)
-                        
-                        # 如果是图片文件，上传到S3并生成预签名URL
-                        presigned_url = None
-                        if is_image:
-                            try:
-                                # 读取图片文件内容
-                                file_content = zip_ref.read(file_path)
-                                
-                                # 上传到S3并生成预签名URL
-                                presigned_url = await self._upload_image_to_s3_and_get_url(
-                                    file_content, 
-                                    full_filename, 
-                                    category, 
-                                    subcategory
-                                )
-                                
-                                # 保存URL映射
-                                mapping_key = f"{category}.{subcategory}.{filename_without_ext}"
-                                image_urls[mapping_key] = presigned_url
-                                
-                                self.logger.debug(f"图片上传成功: {file_path} -> {presigned_url[:50]}...")
-                                
-                            except Exception as e:
-                                self.logger.error(f"图片上传失败: {file_path}, 错误: {str(e)}")
-                                # 不阻断处理流程，继续处理其他文件
-                        
-                        # 构建结构
-                        if category not in asset_structure:
-                            asset_structure[category] = {}
-                        if subcategory not in asset_structure[category]:
-                            asset_structure[category][subcategory] = []
-                        
-                        file_info = {
-                            "filename": filename_without_ext,  # 作为唯一标识
-                            "full_filename": full_filename,   # 完整文件名
-                            "description": description,       # 提取的描述
-                            "path": file_path,               # 完整路径
-                            "resolution": resolution,        # 检测到的分辨率
-                            "is_image": is_image,
-                            "count": 1,  # 默认数量
-                            "presigned_url": presigned_url   # 新增：预签名URL
-                        }
+                        is_image = file_ext in self._image_exts
                         
-                        asset_structure[category][subcategory].append(file_info)
+                        index = columns.append(
+                            category,
+                            subcategory,
+                            full_filename,
+                            file_path,
+                            # 检测分辨率（如果文件名包含分辨率信息）
+                            self._extract_resolution_from_filename(filename_without_ext),
+                            is_image
+                        )
                         
                         # 建立文件路径映射
                         mapping_key = f"{category}.{subcategory}.{filename_without_ext}"
                         file_mappings[mapping_key] = file_path
                         
+                        # 图片文件先收集，遍历结束后并发上传
+                        if is_image:
+                            upload_jobs.append((index, mapping_key, zip_info))
+                        
                     else:
                         self.logger.warning(f"跳过路径格式不正确的文件: {file_path}")
+                
+                # 上传阶段需要从压缩包中流式读取条目，因此在ZipFile关闭前完成
+                await self._upload_images(zip_ref, columns, upload_jobs, image_urls)
         
         except zipfile.BadZipFile as e:
             self.logger.error(f"无效的ZIP文件: {str(e)}")
             raise ValueError("无效的ZIP文件格式")
         
-        return asset_structure, file_mappings, image_urls
+        return columns, file_mappings, image_urls
+    
+    async def _upload_images(self, zip_ref: zipfile.ZipFile, columns: _AssetColumns, upload_jobs: List[Tuple], image_urls: Dict[str, str]):
+        """上传收集到的图片并回填预签名URL到columns.urls和image_urls"""
+        
+        if not upload_jobs:
+            return
+        
+        # 并发上传图片到S3，全部完成后再批量生成预签名URL
+        semaphore = asyncio.Semaphore(self.max_concurrent_uploads)
+        # (category, subcategory) -> (S3键前缀, 公共元数据)，同一子分类的文件共享
+        upload_targets: Dict[Tuple[str, str], Tuple[str, MappingProxyType]] = {}
+        
+        async def _upload_one(index: int, zip_info: zipfile.ZipInfo) -> str:
+            target_key = (columns.categories[index], columns.subcategories[index])
+            target = upload_targets.get(target_key)
+            if target is None:
+                category, subcategory = target_key
+                target = (
+                    f"{self.s3_prefix}/{category}/{subcategory}/",
+                    MappingProxyType({
+                        "category": category,
+                        "subcategory": subcategory,
+                        "upload_source": "file_processing_service"
+                    })
+                )
+                upload_targets[target_key] = target
+            key_prefix, base_metadata = target
+            async with semaphore:
+                return await self._upload_image_to_s3(
+                    zip_ref,
+                    zip_info,
+                    columns.full_filenames[index],
+                    key_prefix,
+                    base_metadata
+                )
+        
+        upload_results = await asyncio.gather(
+            *(_upload_one(index, zip_info) for index, _, zip_info in upload_jobs),
+            return_exceptions=True
+        )
+        
+        uploaded = []  # (文件下标, mapping_key, s3_key)
+        for (index, mapping_key, _), result in zip(upload_jobs, upload_results):
+            if isinstance(result, Exception):
+                # 不阻断处理流程，继续处理其他文件
+                self.logger.error(f"图片上传失败: {columns.paths[index]}, 错误: {str(result)}")
+                continue
+            uploaded.append((index, mapping_key, result))
+        
+        if not uploaded:
+            return
+        
+        presigned_urls = await asyncio.to_thread(
+            self._generate_presigned_urls, [s3_key for _, _, s3_key in uploaded], self._PRESIGN_EXPIRATION
+        )
+        
+        for (index, mapping_key, _), presigned_url in zip(uploaded, presigned_urls):
+            if presigned_url is None:
+                continue
+            columns.urls[index] = presigned_url
+            image_urls[mapping_key] = presigned_url
+            self.logger.debug(f"图片上传成功: {columns.paths[index]} -> {presigned_url[:50]}...")
     
-    async def _upload_image_to_s3_and_get_url(
+    async def _upload_image_to_s3(
         self, 
-        file_content: bytes, 
+        zip_ref: zipfile.ZipFile,
+        zip_info: zipfile.ZipInfo,
         filename: str, 
-        category: str, 
-        subcategory: str
+        key_prefix: str,
+        base_metadata: Mapping[str, str]
     ) -> str:
-        """上传图片到S3并生成预签名URL - 参考art style实现"""
+        """从压缩包流式上传图片到S3，返回S3键 - 参考art style实现
+        
+        Args:
+            key_prefix: 子分类的S3键前缀，形如 "{s3_prefix}/{category}/{subcategory}/"
+            base_metadata: 子分类共享的元数据，此处只追加原始文件名
+        """
         
         # 生成唯一的S3键
-        file_ext = os.path.splitext(filename)[1].lower()
-        unique_id = str(uuid.uuid4())[:8]
-        s3_key = f"{self.s3_prefix}/{category}/{subcategory}/{unique_id}_{filename}"
+        file_ext = _split_ext(filename)[1]
+        s3_key = f"{key_prefix}{secrets.token_hex(4)}_{filename}"
         
         # 确定内容类型
-        content_type_map = {
-            '.jpg': 'image/jpeg',
-            '.jpeg': 'image/jpeg',
-            '.png': 'image/png',
-            '.webp': 'image/webp',
-            '.bmp': 'image/bmp'
-        }
-        content_type = content_type_map.get(file_ext, 'image/jpeg')
-        
-        # 上传到S3（使用同步方法）
-        upload_result = self.s3_service.upload_file_sync(
-            file_content=file_content,
-            key=s3_key,
-            content_type=content_type,
-            metadata={
-                "original_filename": filename,
-                "category": category,
-                "subcategory": subcategory,
-                "upload_source": "file_processing_service"
-            }
-        )
+        content_type = self._CONTENT_TYPE_MAP.get(file_ext, 'image/jpeg')
+        metadata = {"original_filename": filename, **base_metadata}
+        
+        def _stream_upload() -> Dict[str, Any]:
+            # ZipFile对共享文件句柄的读取有锁保护，可在多个线程中各自打开条目
+            with zip_ref.open(zip_info) as stream:
+                return self.s3_service.upload_fileobj_sync(
+                    stream,
+                    key=s3_key,
+                    content_type=content_type,
+                    metadata=metadata
+                )
+        
+        # 同步boto3调用放到线程中执行，避免阻塞事件循环
+        upload_result = await asyncio.to_thread(_stream_upload)
         
         if not upload_result.get("success", True):
             raise Exception(f"S3上传失败: {upload_result.get('error', 'Unknown error')}")
         
-        # 生成预签名URL（有效期1小时）
-        presigned_url = self.s3_service.generate_presigned_url(
-            key=s3_key,
-            expiration=3600,  # 1小时
-            method="GET"
-        )
-        
-        self.logger.info(f"图片上传并生成预签名URL成功", extra={
+        self.logger.info(f"图片上传S3成功", extra={
             "s3_key": s3_key,
             "content_type": content_type,
-            "file_size": len(file_content),
-            "url_preview": presigned_url[:50] + "..."
+            "file_size": zip_info.file_size
         })
         
-        return presigned_url
+        return s3_key
     
-    def get_reference_image_urls_for_task(
-        self, 
-        task_info: Dict[str, Any], 
-        image_urls: Dict[str, str]
-    ) -> List[str]:
-        """
-        根据任务信息获取对应的参考图片URL列表 - 新增方法
-        
-        Args:
-            task_info: 包含category, subcategory, filename的任务信息
-            image_urls: 从process_asset_references返回的图片URL映射
-            
-        Returns:
-            对应的图片URL列表
-        """
-        
-        category = task_info.get("category")
-        subcategory = task_info.get("subcategory")
-        filename = task_info.get("filename")
-        
-        # 构建查找路径，按优先级排序
-        lookup_paths = [
-            f"{category}.{subcategory}.{filename}",  # 精确匹配
-            f"{category}.{subcategory}",              # 子分类匹配
-            f"{category}",                            # 分类匹配
-        ]
-        
-        found_urls = []
-        
-        for path in lookup_paths:
-            if path in image_urls:
-                found_urls.append(image_urls[path])
-                self.logger.debug(f"找到参考图片URL", extra={
-                    "filename": filename,
-                    "lookup_path": path,
-                    "url_preview": image_urls[path][:50] + "..."
-                })
-        
-        # 如果没有找到精确匹配，尝试模糊匹配
-        if not found_urls:
-            for key, url in image_urls.items():
-                if (category in key and subcategory in key) or filename in key:
-                    found_urls.append(url)
-                    self.logger.debug(f"模糊匹配找到参考图片URL", extra={
-                        "filename": filename,
-                        "matched_key": key
-                    })
-        
-        if not found_urls:
-            self.logger.debug(f"未找到参考图片URL", extra={
-                "filename": filename,
-                "category": category,
-                "subcategory": subcategory,
-                "available_keys": list(image_urls.keys())
-            })
-        
-        return found_urls
+    def _generate_presigned_urls(self, s3_keys: List[str], expiration: int = 3600) -> List[Optional[str]]:
+        """批量生成预签名URL（本地签名，无网络往返）；单个失败时对应位置返回None"""
+        presigned_urls = []
+        for s3_key in s3_keys:
+            try:
+                presigned_urls.append(self.s3_service.generate_presigned_url(
+                    key=s3_key,
+                    expiration=expiration,
+                    http_method="GET"
+                ))
+            except Exception as e:
+                self.logger.error(f"生成预签名URL失败: {s3_key}, 错误: {str(e)}")
+                presigned_urls.append(None)
+        return presigned_urls
     
     # === 保持原有方法不变 ===
     
@@ -375,80 +499,75 @@ class FileProcessingService(BaseService):
         
         return None
     
-    def _extract_description_from_filename(self, filename: str) -> str:
-        """从文件名中提取描述信息"""
-        # 移除常见的分辨率模式
-        import re
-        clean_filename = re.sub(r'_\d+x\d+$', '', filename)
-        clean_filename = re.sub(r'_\d+$', '', clean_filename)  # 移除末尾数字
-        
-        # 将下划线和连字符替换为空格，转换为更自然的描述
-        description = clean_filename.replace('_', ' ').replace('-', ' ')
-        
-        # 首字母大写
-        description = ' '.join(word.capitalize() for word in description.split())
-        
-        return description if description else filename
-    
     def _extract_resolution_from_filename(self, filename: str) -> Optional[str]:
         """从文件名中提取分辨率信息"""
-        import re
         # 查找类似 1024x1024 的模式
-        resolution_match = re.search(r'(\d+x\d+)', filename)
-        if resolution_match:
-            return resolution_match.group(1)
-        return None
+        resolution_match = _RES_RE.search(filename)
+        return resolution_match.group(1) if resolution_match else None
     
-    def _convert_to_asset_items(self, asset_structure: Dict[str, Any]) -> Dict[str, Dict[str, List[Dict[str, Any]]]]:
+    def _convert_to_asset_items(self, columns: _AssetColumns) -> Dict[str, Dict[str, List[Dict[str, Any]]]]:
         """将文件结构转换为新的元件格式"""
         asset_items = {}
         
-        for category, subcategories in asset_structure.items():
+        for category, subcategories in columns.groups.items():
             asset_items[category] = {}
-            for subcategory, files in subcategories.items():
-                asset_items[category][subcategory] = []
+            for subcategory, indices in subcategories.items():
+                items = []
                 
-                for file_info in files:
+                for i in indices:
                     # 转换为ImageAssetItem格式
+                    filename = columns.filename(i)
                     item = {
-                        "filename": file_info["filename"],
-                        "description": file_info["description"],
-                        "count": file_info.get("count", 1),
-                        "resolution": file_info.get("resolution")  # 可能为None
+                        "filename": filename,
+                        "description": _describe_filename(filename),
+                        "count": 1
                     }
-                    # 移除None值
-                    item = {k: v for k, v in item.items() if v is not None}
-                    asset_items[category][subcategory].append(item)
+                    # resolution可能为None，此时省略
+                    resolution = columns.resolutions[i]
+                    if resolution is not None:
+                        item["resolution"] = resolution
+                    items.append(item)
+                
+                asset_items[category][subcategory] = items
         
         return asset_items
     
-    def _generate_reference_prompts_v2(self, asset_structure: Dict[str, Any], module: str) -> Dict[str, str]:
+    def _generate_reference_prompts_v2(self, columns: _AssetColumns, module: str) -> Dict[str, str]:
         """生成参考提示词映射 - v2版本，使用描述信息"""
         reference_prompts = {}
         
-        for category, subcategories in asset_structure.items():
-            for subcategory, files in subcategories.items():
-                for file_info in files:
-                    filename = file_info["filename"]
-                    description = file_info["description"]
-                    
+        for category, subcategories in columns.groups.items():
+            category_prompt = None
+            
+            for subcategory, indices in subcategories.items():
+                subcategory_prompt = None
+                
+                for i in indices:
                     # 构建参考提示词，使用提取的描述
                     prompt = self._build_reference_prompt_v2(
-                        module, category, subcategory, filename, description, file_info
+                        module,
+                        category,
+                        subcategory,
+                        columns.description(i),
+                        columns.resolutions[i],
+                        columns.full_filenames[i],
+                        # 只有图片会上传并获得URL
+                        bool(columns.urls[i])
                     )
                     
-                    # 创建多层级的映射
-                    reference_prompts[f"{category}.{subcategory}.{filename}"] = prompt
-                    
-                    # 如果是该子分类的第一个文件，也创建子分类级别的映射
-                    subcategory_key = f"{category}.{subcategory}"
-                    if subcategory_key not in reference_prompts:
-                        reference_prompts[subcategory_key] = prompt
-                    
-                    # 如果是该分类的第一个文件，也创建分类级别的映射
-                    category_key = category
-                    if category_key not in reference_prompts:
-                        reference_prompts[category_key] = prompt
+                    reference_prompts[f"{category}.{subcategory}.{columns.filename(i)}"] = prompt
+                    if subcategory_prompt is None:
+                        subcategory_prompt = prompt
+                
+                # 子分类级别映射使用该子分类的第一个文件
+                if subcategory_prompt is not None:
+                    reference_prompts.setdefault(f"{category}.{subcategory}", subcategory_prompt)
+                    if category_prompt is None:
+                        category_prompt = subcategory_prompt
+            
+            # 分类级别映射使用该分类的第一个文件
+            if category_prompt is not None:
+                reference_prompts.setdefault(category, category_prompt)
         
         return reference_prompts
     
@@ -457,37 +576,33 @@ class FileProcessingService(BaseService):
         module: str, 
         category: str, 
         subcategory: str, 
-        filename: str,
         description: str,
-        file_info: Dict[str, Any]
+        resolution: Optional[str],
+        full_filename: str,
+        has_reference_image: bool
     ) -> str:
         """构建单个文件的参考提示词 - v2版本"""
         
         # 基础提示词模板
-        base_templates = {
-            "symbols": "Create a slot machine symbol for {description}",
-            "ui": "Create a user interface element for {description}",
-            "backgrounds": "Create a background scene for {description}"
-        }
-        
-        base_prompt = base_templates.get(module, f"Create a {module} asset for {description}")
+        base_template = _BASE_PROMPT_TEMPLATES.get(module)
+        base_prompt = base_template.format(description=description) if base_template else f"Create a {module} asset for {description}"
         
         # 添加分类信息
         prompt_parts = [
-            base_prompt.format(description=description),
+            base_prompt,
             f"in {category} category",
             f"{subcategory} subcategory"
         ]
         
         # 添加分辨率信息（如果有）
-        if file_info.get("resolution"):
-            prompt_parts.append(f"with {file_info['resolution']} resolution")
+        if resolution:
+            prompt_parts.append(f"with {resolution} resolution")
         
         # 添加参考指导
-        if file_info.get("is_image") and file_info.get("presigned_url"):
+        if has_reference_image:
             prompt_parts.append("matching the style and composition of the reference image")
         else:
-            prompt_parts.append(f"based on the reference file {file_info['full_filename']}")
+            prompt_parts.append(f"based on the reference file {full_filename}")
         
         # 添加一致性指导
         prompt_parts.extend([
@@ -501,22 +616,15 @@ class FileProcessingService(BaseService):
     
     def _is_valid_archive_file(self, file: UploadFile) -> bool:
         """验证是否为有效的压缩文件"""
-        valid_content_types = [
-            'application/zip', 
-            'application/x-zip-compressed',
-            'application/octet-stream'
-        ]
-        
-        if file.content_type in valid_content_types:
+        if file.content_type in self._VALID_ARCHIVE_CTYPES:
             return True
         
         if file.filename:
-            file_ext = os.path.splitext(file.filename.lower())[1]
-            return file_ext in self.supported_archive_formats
+            return _split_ext(file.filename)[1] in self._archive_exts
         
         return False
     
-    def _validate_asset_structure(self, asset_structure: Dict[str, Any], module: str) -> Dict[str, Any]:
+    def _validate_asset_structure(self, columns: _AssetColumns, module: str) -> Dict[str, Any]:
         """验证资产结构是否符合模块要求"""
         
         # 获取模块期望的分类结构
@@ -533,31 +641,31 @@ class FileProcessingService(BaseService):
             "format_version": "2.1"
         }
         
+        asset_groups = columns.groups
+        
         # 检查缺失的分类
         for expected_category in expected_categories.keys():
-            if expected_category not in asset_structure:
+            if expected_category not in asset_groups:
                 validation_result["missing_categories"].append(expected_category)
                 validation_result["warnings"].append(f"缺少期望的分类: {expected_category}")
         
         # 检查意外的分类
-        for actual_category in asset_structure.keys():
+        for actual_category in asset_groups.keys():
             if actual_category not in expected_categories:
                 validation_result["unexpected_categories"].append(actual_category)
                 validation_result["warnings"].append(f"包含未知的分类: {actual_category}")
         
         # 计算覆盖率
-        for category, subcategories in asset_structure.items():
+        for category, subcategories in asset_groups.items():
             if category in expected_categories:
                 expected_subcategories = expected_categories[category].get("subcategories", {})
                 coverage_info = {
                     "expected": list(expected_subcategories.keys()),
                     "actual": list(subcategories.keys()),
                     "coverage_percentage": 0,
-                    "asset_items_count": sum(len(items) for items in subcategories.values()),
-                    "image_items_count": sum(
-                        len([item for item in items if item.get("is_image", False)]) 
-                        for items in subcategories.values()
-                    )
+                    "asset_items_count": sum(len(indices) for indices in subcategories.values()),
+                    # 图片数量在解析时已按分类累计，无需再次遍历
+                    "image_items_count": columns.image_counts.get(category, 0)
                 }
                 
                 if expected_subcategories:
@@ -577,8 +685,7 @@ class FileProcessingService(BaseService):
         if not filename:
             return False
         
-        file_ext = os.path.splitext(filename.lower())[1]
-        return file_ext in self.supported_image_formats
+        return _split_ext(filename)[1] in self._image_exts
 
 # 全局实例
 file_processing_service = FileProcessingService()
\ No newline at end of file
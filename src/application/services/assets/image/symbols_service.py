@@ -1,10 +1,90 @@
 # src/application/services/assets/image/symbols_service.py (简化版 - 清晰的提示词构建)
-from typing import Dict, Any, List
+from itertools import chain
+from types import MappingProxyType
+from typing import Dict, Any, Optional, Tuple
 from .base_image_service import BaseImageService
 
+# Slot machine 基本要求（描述相关的首项在构建时添加）
+_BASE_REQUIREMENTS = (
+    "high quality game asset",
+    "centered composition",
+    "clear silhouette",
+    "suitable for slot machine gameplay"
+)
+
+# 第一层：分类要求；第二层：子分类要求
+_CATEGORY_TEMPLATES = MappingProxyType({
+    "base_symbols": {
+        "low_value": (
+            "designed as a lower-value game symbol",
+            "clean and recognizable design",
+            "suitable for frequent appearance"
+        ),
+        "high_value": (
+            "designed as a high-value premium symbol",
+            "ornate and eye-catching appearance", 
+            "detailed and luxurious design"
+        )
+    },
+    "special_symbols": {
+        "wild": (
+            "designed as a WILD symbol with powerful visual impact",
+            "magical or mystical elements",
+            "glowing effects",
+            "besides main element, should have a frame, may include 'WILD' text and optional multiplier values in the same row"
+        ),
+        "scatter": (
+            "designed as a SCATTER symbol with dynamic energy",
+            "radiating or explosive visual elements",
+            "sparkling effects",
+            "conveys bonus trigger functionality",
+            "besides main element, should have a frame"
+        ),
+        "bonus": (
+            "designed as a BONUS symbol representing rewards",
+            "treasure or prize-like elements",
+            "golden glow or valuable appearance"
+        )
+    }
+})
+
+
+# 未知分类的通用要求：首项带分类名，其余各项固定
+_CUSTOM_CATEGORY_HEAD = "designed as a {} symbol"
+_CUSTOM_CATEGORY_TAIL = (
+    "distinctive and clear design",
+    "optimized for game use"
+)
+
+# 扁平化索引：(category, subcategory) -> 要求；(category, None) 为该分类的默认（第一个子分类）
+_FLAT_TEMPLATES: Dict[Tuple[str, Optional[str]], Tuple[str, ...]] = {
+    **{
+        (category, None): next(iter(subcategories.values()))
+        for category, subcategories in _CATEGORY_TEMPLATES.items()
+    },
+    **{
+        (category, subcategory): requirements
+        for category, subcategories in _CATEGORY_TEMPLATES.items()
+        for subcategory, requirements in subcategories.items()
+    }
+}
+
+
+def _get_category_requirements(category: str, subcategory: str) -> Tuple[str, ...]:
+    """根据(category, subcategory)返回对应要求，子分类未知时退回分类默认"""
+    requirements = _FLAT_TEMPLATES.get((category, subcategory)) or _FLAT_TEMPLATES.get((category, None))
+    if requirements is not None:
+        return requirements
+    
+    # 完全自定义的情况
+    return (_CUSTOM_CATEGORY_HEAD.format(category), *_CUSTOM_CATEGORY_TAIL)
+
+
 class SymbolsService(BaseImageService):
     """符号生成服务 - 使用Art Style模块，专注于符号相关的提示词构建"""
     
+    _CATEGORY_NAMES = ("base_symbols", "special_symbols")
+    
     def get_module_name(self) -> str:
         return "symbols"
     
@@ -14,8 +94,8 @@ class SymbolsService(BaseImageService):
             "The symbol should be detailed, visually appealing, and suitable for use in online slot games."
         )
     
-    def _get_category_names(self) -> List[str]:
-        return ["base_symbols", "special_symbols"]
+    def _get_category_names(self) -> Tuple[str, ...]:
+        return self._CATEGORY_NAMES
     
     def build_content_prompt(self, task_info: Dict[str, Any], art_style_data: Dict[str, Any]) -> str:
         """构建符号相关的内容提示词"""
@@ -25,73 +105,16 @@ class SymbolsService(BaseImageService):
         category = task_info.get("category", "")
         subcategory = task_info.get("subcategory", "")
         
-        # Slot machine 基本要求
-        base_requirements = [
-            f"Create a slot machine symbol: {description}",
-            "high quality game asset",
-            "centered composition", 
-            "clear silhouette",
-            "suitable for slot machine gameplay"
-        ]
-        
         # 根据双层字典构建模板
         category_requirements = self._get_category_requirements(category, subcategory)
         
-        # 组合完整提示词
-        prompt_parts = base_requirements + category_requirements
-        
-        return ", ".join(prompt_parts)
+        # 组合完整提示词，直接串联各部分，不构建中间列表
+        return ", ".join(chain(
+            (f"Create a slot machine symbol: {description}",),
+            _BASE_REQUIREMENTS,
+            category_requirements
+        ))
     
-    def _get_category_requirements(self, category: str, subcategory: str) -> List[str]:
+    def _get_category_requirements(self, category: str, subcategory: str) -> Tuple[str, ...]:
         """根据双层字典结构返回对应要求"""
-        
-        # 第一层：分类要求
-        category_templates = {
-            "base_symbols": {
-                "low_value": [
-                    "designed as a lower-value game symbol",
-                    "clean and recognizable design",
-                    "suitable for frequent appearance"
-                ],
-                "high_value": [
-                    "designed as a high-value premium symbol",
-                    "ornate and eye-catching appearance", 
-                    "detailed and luxurious design"
-                ]
-            },
-            "special_symbols": {
-                "wild": [
-                    "designed as a WILD symbol with powerful visual impact",
-                    "magical or mystical elements",
-                    "glowing effects",
-                    "besides main element, should have a frame, may include 'WILD' text and optional multiplier values in the same row"
-                ],
-                "scatter": [
-                    "designed as a SCATTER symbol with dynamic energy",
-                    "radiating or explosive visual elements",
-                    "sparkling effects",
-                    "conveys bonus trigger functionality",
-                    "besides main element, should have a frame"
-                ],
-                "bonus": [
-                    "designed as a BONUS symbol representing rewards",
-                    "treasure or prize-like elements",
-                    "golden glow or valuable appearance"
-                ]
-            }
-        }
-        
-        # 获取对应模板，如果找不到就返回通用模板
-        if category in category_templates and subcategory in category_templates[category]:
-            return category_templates[category][subcategory]
-        elif category in category_templates:
-            # 如果有分类但没有子分类，返回该分类的第一个子分类作为默认
-            first_subcategory = list(category_templates[category].keys())[0]
-            return category_templates[category][first_subcategory]
-        else:
-            # 完全自定义的情况
-            return [
-                f"designed as a {category} symbol",
-                "distinctive and clear design",
-                "optimized for game use"
-            ]
\ No newline at end of file
+        return _get_category_requirements(category, subcategory)
@@ -1,21 +1,99 @@
 # src/application/services/assets/image/ui_service.py (简化版 - 清晰的提示词构建)
-from typing import Dict, Any, List
+from itertools import chain
+from types import MappingProxyType
+from typing import Dict, Any, Optional, Tuple
 from .base_image_service import BaseImageService
 
+# UI 基本要求（描述相关的首项在构建时添加）
+_BASE_REQUIREMENTS = (
+    "modern and intuitive design",
+    "suitable for slot machine games",
+    "clean and functional appearance"
+)
+
+# 第一层：分类要求；第二层：子分类要求
+_CATEGORY_TEMPLATES = MappingProxyType({
+    "buttons": {
+        "main_controls": (
+            "primary action button design",
+            "includes Normal, Hover, and Press states",
+            "prominent and easily clickable",
+            "consistent shape and spacing"
+        ),
+        "toggle_controls": (
+            "toggle button showing On and Off states",
+            "clear visual distinction between states",
+            "includes appropriate icons"
+        ),
+        "icon_buttons": (
+            "icon-style button with clear symbol",
+            "square or rounded base design",
+            "clean silhouette for recognition"
+        )
+    },
+    "panels": {
+        "info_panels": (
+            "information display panel design",
+            "clear and readable layout",
+            "suitable for displaying game statistics"
+        ),
+        "game_area": (
+            "game area background panel",
+            "provides context without distraction",
+            "balanced visual weight"
+        )
+    }
+})
+
+
+# 未知分类的通用要求：首项带分类名，其余各项固定
+_CUSTOM_CATEGORY_HEAD = "designed as a {} UI element"
+_CUSTOM_CATEGORY_TAIL = (
+    "functional and user-friendly design",
+    "game interface appropriate"
+)
+
+# 扁平化索引：(category, subcategory) -> 要求；(category, None) 为该分类的默认（第一个子分类）
+_FLAT_TEMPLATES: Dict[Tuple[str, Optional[str]], Tuple[str, ...]] = {
+    **{
+        (category, None): next(iter(subcategories.values()))
+        for category, subcategories in _CATEGORY_TEMPLATES.items()
+    },
+    **{
+        (category, subcategory): requirements
+        for category, subcategories in _CATEGORY_TEMPLATES.items()
+        for subcategory, requirements in subcategories.items()
+    }
+}
+
+
+def _get_category_requirements(category: str, subcategory: str) -> Tuple[str, ...]:
+    """根据(category, subcategory)返回对应要求，子分类未知时退回分类默认"""
+    requirements = _FLAT_TEMPLATES.get((category, subcategory)) or _FLAT_TEMPLATES.get((category, None))
+    if requirements is not None:
+        return requirements
+    
+    # 完全自定义的情况
+    return (_CUSTOM_CATEGORY_HEAD.format(category), *_CUSTOM_CATEGORY_TAIL)
+
+
 class UIService(BaseImageService):
     """UI生成服务 - 使用Art Style模块，专注于UI相关的提示词构建"""
     
+    _DEFAULT_PROMPT_TEMPLATE = (
+        "Create a high-quality user interface element for {content_description}. "
+        "The UI element should be modern, intuitive, and suitable for online slot machine games."
+    )
+    _CATEGORY_NAMES = ("buttons", "panels")
+    
     def get_module_name(self) -> str:
         return "ui"
     
     def get_default_prompt_template(self) -> str:
-        return (
-            "Create a high-quality user interface element for {content_description}. "
-            "The UI element should be modern, intuitive, and suitable for online slot machine games."
-        )
+        return self._DEFAULT_PROMPT_TEMPLATE
     
-    def _get_category_names(self) -> List[str]:
-        return ["buttons", "panels"]
+    def _get_category_names(self) -> Tuple[str, ...]:
+        return self._CATEGORY_NAMES
     
     def build_content_prompt(self, task_info: Dict[str, Any], art_style_data: Dict[str, Any]) -> str:
         """构建UI相关的内容提示词"""
@@ -25,70 +103,16 @@ class UIService(BaseImageService):
         category = task_info.get("category", "")
         subcategory = task_info.get("subcategory", "")
         
-        # UI 基本要求
-        base_requirements = [
-            f"Create a game UI element: {description}",
-            "modern and intuitive design",
-            "suitable for slot machine games",
-            "clean and functional appearance"
-        ]
-        
         # 根据双层字典构建模板
         category_requirements = self._get_category_requirements(category, subcategory)
         
-        # 组合完整提示词
-        prompt_parts = base_requirements + category_requirements
-        
-        return ", ".join(prompt_parts)
+        # 组合完整提示词，直接串联各部分，不构建中间列表
+        return ", ".join(chain(
+            (f"Create a game UI element: {description}",),
+            _BASE_REQUIREMENTS,
+            category_requirements
+        ))
     
-    def _get_category_requirements(self, category: str, subcategory: str) -> List[str]:
+    def _get_category_requirements(self, category: str, subcategory: str) -> Tuple[str, ...]:
         """根据双层字典结构返回对应要求"""
-        
-        # 第一层：分类要求
-        category_templates = {
-            "buttons": {
-                "main_controls": [
-                    "primary action button design",
-                    "includes Normal, Hover, and Press states",
-                    "prominent and easily clickable",
-                    "consistent shape and spacing"
-                ],
-                "toggle_controls": [
-                    "toggle button showing On and Off states",
-                    "clear visual distinction between states",
-                    "includes appropriate icons"
-                ],
-                "icon_buttons": [
-                    "icon-style button with clear symbol",
-                    "square or rounded base design",
-                    "clean silhouette for recognition"
-                ]
-            },
-            "panels": {
-                "info_panels": [
-                    "information display panel design",
-                    "clear and readable layout",
-                    "suitable for displaying game statistics"
-                ],
-                "game_area": [
-                    "game area background panel",
-                    "provides context without distraction",
-                    "balanced visual weight"
-                ]
-            }
-        }
-        
-        # 获取对应模板，如果找不到就返回通用模板
-        if category in category_templates and subcategory in category_templates[category]:
-            return category_templates[category][subcategory]
-        elif category in category_templates:
-            # 如果有分类但没有子分类，返回该分类的第一个子分类作为默认
-            first_subcategory = list(category_templates[category].keys())[0]
-            return category_templates[category][first_subcategory]
-        else:
-            # 完全自定义的情况
-            return [
-                f"designed as a {category} UI element",
-                "functional and user-friendly design",
-                "game interface appropriate"
-            ]
\ No newline at end of file
+        return _get_category_requirements(category, subcategory)
@@ -1,11 +1,167 @@
 # src/application/services/assets/animation_service.py - 修复版
-from typing import Dict, Any, List, Optional
+import logging
+from types import MappingProxyType
+from typing import Dict, Any, List, Optional, Mapping
 from src.application.services.assets.core.base_asset_service import BaseAssetService
 from src.application.services.external.ai_service_factory import ai_service_factory
-from src.schemas.enums.asset_enums import AssetTypeEnum, ModelProviderEnum
+from src.schemas.enums.asset_enums import AssetTypeEnum
 from src.infrastructure.decorators.retry import simple_retry
 
 
+# 模型能力描述
+_MODEL_CAPABILITIES = MappingProxyType({
+    "pixverse": {
+        "description": "文本到动画生成，支持多种风格和特效",
+        "input_types": ["text", "image"],
+        "max_duration": 8,
+        "output_format": "mp4",
+        "features": ["text_to_video", "style_control", "effect_control", "quality_options"],
+        "best_for": ["creative_content", "social_media", "marketing"]
+    },
+    "pia": {
+        "description": "图片到动画生成，精确运动控制",
+        "input_types": ["text", "image"],
+        "max_duration": 24,
+        "output_format": "mp4",
+        "features": ["image_to_video", "motion_control", "style_transfer", "precision_animation"],
+        "best_for": ["portrait_animation", "character_animation", "product_demo"]
+    }
+})
+
+# 各模型的示例参数
+_PIXVERSE_EXAMPLES = MappingProxyType({
+    "fantasy_scene": {
+        "prompt": "A magical forest with glowing mushrooms and fairy lights",
+        "quality": "1080p",
+        "duration": 5,
+        "aspect_ratio": "16:9",
+        "style": "fantasy"
+    },
+    "character_action": {
+        "prompt": "A robot dancing in a futuristic city",
+        "quality": "720p",
+        "duration": 8,
+        "aspect_ratio": "9:16",
+        "motion_mode": "smooth",
+        "style": "cyberpunk"
+    },
+    "social_media": {
+        "prompt": "Cute cat playing with yarn ball",
+        "quality": "1080p",
+        "duration": 5,
+        "aspect_ratio": "1:1",
+        "motion_mode": "smooth",
+        "style": "anime"
+    }
+})
+
+_PIA_EXAMPLES = MappingProxyType({
+    "portrait_animation": {
+        "prompt": "Person smiling and nodding",
+        "image": "https://example.com/portrait.jpg",
+        "style": "realistic",
+        "motion_scale": 1,
+        "animation_length": 16
+    },
+    "cartoon_character": {
+        "prompt": "Cartoon character waving hello",
+        "image": "https://example.com/cartoon.jpg",
+        "style": "3d_cartoon",
+        "motion_scale": 2,
+        "guidance_scale": 8.0
+    },
+    "product_demo": {
+        "prompt": "Product rotating slowly showcasing all angles",
+        "image": "https://example.com/product.jpg",
+        "style": "realistic",
+        "motion_scale": 1,
+        "guidance_scale": 9.0,
+        "animation_length": 12
+    }
+})
+
+# 模型 -> 示例参数
+_EXAMPLES_BY_MODEL = MappingProxyType({
+    "pixverse": _PIXVERSE_EXAMPLES,
+    "pia": _PIA_EXAMPLES
+})
+
+# 未配置示例的模型返回的空视图
+_NO_EXAMPLES = MappingProxyType({})
+
+# Pixverse模型的默认值
+_PIXVERSE_DEFAULTS = {
+    "quality": "1080p",
+    "duration": 5,
+    "motion_mode": "normal",
+    "aspect_ratio": "16:9",
+    "negative_prompt": "",
+    "style": "None",
+    "effect": "None"
+}
+
+# PIA模型的默认值
+_PIA_DEFAULTS = {
+    "max_size": 512,
+    "style": "3d_cartoon",
+    "motion_scale": 1,
+    "guidance_scale": 7.5,
+    "sampling_steps": 25,
+    "negative_prompt": "",
+    "animation_length": 16,
+    "ip_adapter_scale": 1.0
+}
+
+# 未单独配置的模型使用的通用默认值
+_COMMON_DEFAULTS = {
+    "quality": "720p",
+    "duration": 5,
+    "aspect_ratio": "16:9"
+}
+
+# 模型 -> 默认值
+_DEFAULTS_BY_MODEL = {
+    "pixverse": _PIXVERSE_DEFAULTS,
+    "pia": _PIA_DEFAULTS
+}
+
+# 支持的视频质量（元组保留展示顺序，frozenset用于校验）
+_QUALITY_OPTIONS = ("360p", "540p", "720p", "1080p")
+_VALID_QUALITIES = frozenset(_QUALITY_OPTIONS)
+
+# 图片URL允许的协议前缀
+_URL_SCHEMES = ("http://", "https://")
+
+# 参数校验时表示"未提供"的哨兵
+_MISSING = object()
+
+# 数值参数允许的精确类型（JSON解码只产生int/float，不考虑子类）
+_NUMBER_TYPES = (int, float)
+
+# 服务层的额外生成限制
+_SERVICE_LIMITS = {
+    "models": {
+        "pixverse": {
+            "max_duration": 8,
+            "max_outputs_per_request": 10,
+            "recommended_duration": 5,
+            "supported_qualities": ["360p", "540p", "720p", "1080p"]
+        },
+        "pia": {
+            "max_duration": 24,
+            "max_outputs_per_request": 5,
+            "recommended_duration": 16,
+            "max_image_size": 1024
+        }
+    },
+    "general": {
+        "min_duration": 3,
+        "max_concurrent_generations": 3,
+        "estimated_time_per_second": 30.0
+    }
+}
+
+
 class AnimationService(BaseAssetService):
     """动画生成服务 - 修复版"""
     
@@ -13,33 +169,15 @@ class AnimationService(BaseAssetService):
         return AssetTypeEnum.ANIMATION
     
     def get_service_info(self) -> Dict[str, Any]:
-        base_info = super().get_service_info()
-        return {
-            **base_info,
-            "description": "动画生成服务 - 支持Pixverse和PIA模型",
-            "model_capabilities": self._get_model_capabilities()
-        }
+        # 基类的get_service_info是抽象方法，没有返回值；此处的字典为新建对象，直接写入
+        service_info = super().get_service_info() or {}
+        service_info["description"] = "动画生成服务 - 支持Pixverse和PIA模型"
+        service_info["model_capabilities"] = dict(self._get_model_capabilities())
+        return service_info
     
-    def _get_model_capabilities(self) -> Dict[str, Any]:
-        """获取模型能力描述"""
-        return {
-            "pixverse": {
-                "description": "文本到动画生成，支持多种风格和特效",
-                "input_types": ["text", "image"],
-                "max_duration": 8,
-                "output_format": "mp4",
-                "features": ["text_to_video", "style_control", "effect_control", "quality_options"],
-                "best_for": ["creative_content", "social_media", "marketing"]
-            },
-            "pia": {
-                "description": "图片到动画生成，精确运动控制",
-                "input_types": ["text", "image"],
-                "max_duration": 24,
-                "output_format": "mp4",
-                "features": ["image_to_video", "motion_control", "style_transfer", "precision_animation"],
-                "best_for": ["portrait_animation", "character_animation", "product_demo"]
-            }
-        }
+    def _get_model_capabilities(self) -> Mapping[str, Any]:
+        """获取模型能力描述（只读视图）"""
+        return _MODEL_CAPABILITIES
     
     async def generate(
         self, 
@@ -50,12 +188,14 @@ class AnimationService(BaseAssetService):
     ) -> List[str]:
         """生成动画 - 使用基类的模型解析"""
         try:
-            self.logger.info(f"开始生成动画: {model}", extra={
-                "model": model,
-                "num_outputs": num_outputs,
-                "provider": provider,
-                "params_keys": list(generation_params.keys()) if generation_params else []
-            })
+            # 日志级别过滤掉时跳过extra字典的构建
+            if self.logger.isEnabledFor(logging.INFO):
+                self.logger.info("开始生成动画: %s", model, extra={
+                    "model": model,
+                    "num_outputs": num_outputs,
+                    "provider": provider,
+                    "params_keys": tuple(generation_params) if generation_params else ()
+                })
             
             # 验证请求
             self.validate_generation_request(model, num_outputs, provider)
@@ -63,14 +203,15 @@ class AnimationService(BaseAssetService):
             # 解析模型配置 - 使用基类方法，确保返回正确的model_id字符串
             model_id, provider_name = self.resolve_model_config(model, provider)
             
-            self.logger.debug(f"解析到模型ID: {model_id}", extra={
-                "original_model": model,
-                "provider": provider_name,
-                "resolved_model_id": model_id
-            })
+            if self.logger.isEnabledFor(logging.DEBUG):
+                self.logger.debug("解析到模型ID: %s", model_id, extra={
+                    "original_model": model,
+                    "provider": provider_name,
+                    "resolved_model_id": model_id
+                })
             
-            # 获取AI服务
-            ai_service = ai_service_factory.get_service(ModelProviderEnum(provider_name))
+            # 获取AI服务 - 工厂按提供商名称字符串查找，无需先转换为枚举
+            ai_service = ai_service_factory.get_service(provider_name)
             
             # 预处理生成参数
             processed_params = self._preprocess_generation_params(model, generation_params)
@@ -78,7 +219,7 @@ class AnimationService(BaseAssetService):
             # 调用AI服务进行推理 - 传递正确的model_id字符串
             results = await ai_service.batch_inference(model_id, processed_params, num_outputs)
             
-            self.logger.info(f"动画生成完成: {len(results)}个结果", extra={
+            self.logger.info("动画生成完成: %d个结果", len(results), extra={
                 "model": model,
                 "model_id": model_id,
                 "provider": provider_name,
@@ -88,7 +229,7 @@ class AnimationService(BaseAssetService):
             return results
             
         except Exception as e:
-            self.logger.error(f"动画生成失败: {str(e)}", extra={
+            self.logger.error("动画生成失败: %s", e, extra={
                 "model": model,
                 "provider": provider,
                 "error_type": type(e).__name__
@@ -96,178 +237,60 @@ class AnimationService(BaseAssetService):
             raise
     
     def _preprocess_generation_params(self, model: str, params: Dict[str, Any]) -> Dict[str, Any]:
-        """预处理生成参数 - 在Service层设置默认值和验证"""
-        processed_params = params.copy()
+        """预处理生成参数 - 在Service层设置默认值和验证
         
+        每次调用只构建一个新字典：参数已包含全部默认项时返回其副本，
+        否则返回与默认值合并的结果；不会修改调用方传入的params
+        """
         # 验证必需参数
-        if "prompt" not in processed_params:
+        if "prompt" not in params:
             raise ValueError(f"{model} 模型缺少必需参数: prompt")
         
-        # 根据不同模型进行参数预处理
-        if model == "pixverse":
-            self._apply_pixverse_defaults(processed_params)
-        elif model == "pia":
-            self._apply_pia_defaults(processed_params)
+        # 验证PIA模型必需的image参数
+        if model == "pia" and "image" not in params:
+            raise ValueError("PIA模型缺少必需参数: image")
+        
+        # 合并模型默认值，用户传入的参数优先
+        defaults = _DEFAULTS_BY_MODEL.get(model, _COMMON_DEFAULTS)
+        if defaults.keys() <= params.keys():
+            # 参数已包含全部默认项（如重试时重放的参数），无需合并
+            processed_params = dict(params)
         else:
-            # 通用默认值
-            self._apply_common_defaults(processed_params)
+            processed_params = {**defaults, **params}
         
         # 验证参数
         self._validate_common_params(processed_params)
         
         return processed_params
     
-    def _apply_pixverse_defaults(self, params: Dict[str, Any]) -> None:
-        """应用Pixverse模型的默认值"""
-        defaults = {
-            "quality": "1080p",
-            "duration": 5,
-            "motion_mode": "normal",
-            "aspect_ratio": "16:9",
-            "negative_prompt": "",
-            "style": "None",
-            "effect": "None"
-        }
-        
-        for key, default_value in defaults.items():
-            params.setdefault(key, default_value)
-    
-    def _apply_pia_defaults(self, params: Dict[str, Any]) -> None:
-        """应用PIA模型的默认值"""
-        # 验证必需的image参数
-        if "image" not in params:
-            raise ValueError("PIA模型缺少必需参数: image")
-        
-        defaults = {
-            "max_size": 512,
-            "style": "3d_cartoon",
-            "motion_scale": 1,
-            "guidance_scale": 7.5,
-            "sampling_steps": 25,
-            "negative_prompt": "",
-            "animation_length": 16,
-            "ip_adapter_scale": 1.0
-        }
-        
-        for key, default_value in defaults.items():
-            params.setdefault(key, default_value)
-    
-    def _apply_common_defaults(self, params: Dict[str, Any]) -> None:
-        """应用通用默认值"""
-        defaults = {
-            "quality": "720p",
-            "duration": 5,
-            "aspect_ratio": "16:9"
-        }
-        
-        for key, default_value in defaults.items():
-            params.setdefault(key, default_value)
-    
     def _validate_common_params(self, params: Dict[str, Any]) -> None:
         """验证通用参数"""
+        # 每个参数只查一次字典；用哨兵区分"未提供"和显式传入的None
         # 时长验证（对于pixverse）
-        if "duration" in params:
-            duration = params["duration"]
-            if not isinstance(duration, (int, float)) or duration <= 0:
+        duration = params.get("duration", _MISSING)
+        if duration is not _MISSING:
+            if type(duration) not in _NUMBER_TYPES or duration <= 0:
                 raise ValueError(f"duration 必须是正数，当前值: {duration}")
             
             if duration > 30:  # 最大30秒
                 raise ValueError(f"duration 不能超过30秒，当前值: {duration}")
         
         # 图片URL验证（对于需要图片的模型）
-        if "image" in params and params["image"]:
-            image_url = params["image"]
-            if not image_url.startswith(("http://", "https://")):
-                raise ValueError("image URL必须以http://或https://开头")
+        image_url = params.get("image")
+        if image_url and not image_url.startswith(_URL_SCHEMES):
+            raise ValueError("image URL必须以http://或https://开头")
         
         # 质量验证
-        if "quality" in params:
-            quality = params["quality"]
-            valid_qualities = ["360p", "540p", "720p", "1080p"]
-            if quality not in valid_qualities:
-                raise ValueError(f"quality 必须是{valid_qualities}之一，当前值: {quality}")
+        quality = params.get("quality", _MISSING)
+        # 先判断类型：不可哈希的值查frozenset会抛TypeError而不是ValueError
+        if quality is not _MISSING and (not isinstance(quality, str) or quality not in _VALID_QUALITIES):
+            raise ValueError(f"quality 必须是{list(_QUALITY_OPTIONS)}之一，当前值: {quality}")
     
-    def get_model_examples(self, model: str) -> Dict[str, Any]:
-        """获取模型的示例参数"""
-        if model == "pixverse":
-            return {
-                "fantasy_scene": {
-                    "prompt": "A magical forest with glowing mushrooms and fairy lights",
-                    "quality": "1080p",
-                    "duration": 5,
-                    "aspect_ratio": "16:9",
-                    "style": "fantasy"
-                },
-                "character_action": {
-                    "prompt": "A robot dancing in a futuristic city",
-                    "quality": "720p",
-                    "duration": 8,
-                    "aspect_ratio": "9:16",
-                    "motion_mode": "smooth",
-                    "style": "cyberpunk"
-                },
-                "social_media": {
-                    "prompt": "Cute cat playing with yarn ball",
-                    "quality": "1080p",
-                    "duration": 5,
-                    "aspect_ratio": "1:1",
-                    "motion_mode": "smooth",
-                    "style": "anime"
-                }
-            }
-        elif model == "pia":
-            return {
-                "portrait_animation": {
-                    "prompt": "Person smiling and nodding",
-                    "image": "https://example.com/portrait.jpg",
-                    "style": "realistic",
-                    "motion_scale": 1,
-                    "animation_length": 16
-                },
-                "cartoon_character": {
-                    "prompt": "Cartoon character waving hello",
-                    "image": "https://example.com/cartoon.jpg",
-                    "style": "3d_cartoon",
-                    "motion_scale": 2,
-                    "guidance_scale": 8.0
-                },
-                "product_demo": {
-                    "prompt": "Product rotating slowly showcasing all angles",
-                    "image": "https://example.com/product.jpg",
-                    "style": "realistic",
-                    "motion_scale": 1,
-                    "guidance_scale": 9.0,
-                    "animation_length": 12
-                }
-            }
-        else:
-            return {}
+    def get_model_examples(self, model: str) -> Mapping[str, Any]:
+        """获取模型的示例参数（只读视图）"""
+        return _EXAMPLES_BY_MODEL.get(model, _NO_EXAMPLES)
     
-    def get_generation_limits(self) -> Dict[str, Any]:
-        """获取生成限制 - 从配置和服务层合并"""
-        base_limits = super().get_generation_limits()
-        
-        # 添加服务层的额外限制
-        service_limits = {
-            "models": {
-                "pixverse": {
-                    "max_duration": 8,
-                    "max_outputs_per_request": 10,
-                    "recommended_duration": 5,
-                    "supported_qualities": ["360p", "540p", "720p", "1080p"]
-                },
-                "pia": {
-                    "max_duration": 24,
-                    "max_outputs_per_request": 5,
-                    "recommended_duration": 16,
-                    "max_image_size": 1024
-                }
-            },
-            "general": {
-                "min_duration": 3,
-                "max_concurrent_generations": 3,
-                "estimated_time_per_second": 30.0
-            }
-        }
-        
-        return {**base_limits, **service_limits}
\ No newline at end of file
+    def get_generation_limits(self) -> Mapping[str, Any]:
+        """获取生成限制 - 从配置和服务层合并，返回只读视图"""
+        # 配置返回的是配置中的共享字典，用 | 生成新字典合并，不能原地update
+        return MappingProxyType(super().get_generation_limits() | _SERVICE_LIMITS)
\ No newline at end of file
@@ -1,11 +1,153 @@
 # src/application/services/assets/audio_service.py - 简化版
-from typing import Dict, Any, List, Optional
+import logging
+from types import MappingProxyType
+from typing import Dict, Any, List, Optional, Mapping
 from src.application.services.assets.core.base_asset_service import BaseAssetService
 from src.application.services.external.ai_service_factory import ai_service_factory
-from src.schemas.enums.asset_enums import AssetTypeEnum, ModelProviderEnum
+from src.schemas.enums.asset_enums import AssetTypeEnum
 from src.infrastructure.decorators.retry import simple_retry
 
 
+# 模型能力描述
+_MODEL_CAPABILITIES = MappingProxyType({
+    "ardianfe": {
+        "description": "高质量立体声音乐生成",
+        "max_duration": 300,
+        "output_formats": ["wav", "mp3"],
+        "features": ["stereo", "chord_progression", "construction_vibes"],
+        "best_for": ["game_music", "ambient", "electronic"]
+    },
+    "meta": {
+        "description": "Meta MusicGen快速音乐生成",
+        "max_duration": 600,
+        "output_formats": ["wav", "mp3"],
+        "features": ["melody_generation", "multiple_versions", "continuation"],
+        "best_for": ["general_music", "classical", "pop"]
+    }
+})
+
+# 各模型的示例参数
+_ARDIANFE_EXAMPLES = MappingProxyType({
+    "game_background": {
+        "prompt": "Epic orchestral music for RPG game battle scene",
+        "duration": 60,
+        "temperature": 0.8,
+        "output_format": "wav"
+    },
+    "ambient_relaxing": {
+        "prompt": "Peaceful ambient music with nature sounds and soft piano",
+        "duration": 180,
+        "temperature": 0.6,
+        "classifier_free_guidance": 4.0
+    },
+    "electronic_upbeat": {
+        "prompt": "Energetic electronic dance music with heavy bass",
+        "duration": 30,
+        "temperature": 1.2,
+        "multi_band_diffusion": True
+    }
+})
+
+_META_EXAMPLES = MappingProxyType({
+    "classical_piano": {
+        "prompt": "Beautiful classical piano melody in C major",
+        "duration": 45,
+        "model_version": "melody-large",
+        "classifier_free_guidance": 3.5
+    },
+    "upbeat_electronic": {
+        "prompt": "Upbeat electronic dance music with synthesizers",
+        "duration": 30,
+        "model_version": "stereo-large",
+        "temperature": 1.0
+    },
+    "cinematic_orchestral": {
+        "prompt": "Epic cinematic orchestral score with full orchestra",
+        "duration": 120,
+        "model_version": "stereo-melody-large",
+        "temperature": 0.9
+    }
+})
+
+# 模型 -> 示例参数
+_EXAMPLES_BY_MODEL = MappingProxyType({
+    "ardianfe": _ARDIANFE_EXAMPLES,
+    "meta": _META_EXAMPLES
+})
+
+# 未配置示例的模型返回的空视图
+_NO_EXAMPLES = MappingProxyType({})
+
+# Ardianfe模型的默认值
+_ARDIANFE_DEFAULTS = {
+    "duration": 8,
+    "top_k": 250,
+    "top_p": 0.0,
+    "temperature": 1.0,
+    "continuation": False,
+    "continuation_start": 0,
+    "output_format": "wav",
+    "multi_band_diffusion": False,
+    "normalization_strategy": "loudness",
+    "classifier_free_guidance": 3.0
+}
+
+# Meta模型的默认值
+_META_DEFAULTS = {
+    "duration": 8,
+    "temperature": 1.0,
+    "top_k": 250,
+    "top_p": 0.0,
+    "continuation": False,
+    "continuation_start": 0,
+    "model_version": "stereo-large",
+    "output_format": "mp3",
+    "multi_band_diffusion": False,
+    "normalization_strategy": "peak",
+    "classifier_free_guidance": 3.0
+}
+
+# 未单独配置的模型使用的通用默认值
+_COMMON_DEFAULTS = {
+    "duration": 8,
+    "temperature": 1.0,
+    "output_format": "wav"
+}
+
+# 模型 -> 默认值
+_DEFAULTS_BY_MODEL = {
+    "ardianfe": _ARDIANFE_DEFAULTS,
+    "meta": _META_DEFAULTS
+}
+
+# 支持的输出格式
+_VALID_OUTPUT_FORMATS = frozenset({"wav", "mp3"})
+
+# 数值参数允许的精确类型（JSON解码只产生int/float，不考虑子类）
+_NUMBER_TYPES = (int, float)
+
+# 服务层的额外生成限制
+_SERVICE_LIMITS = {
+    "models": {
+        "ardianfe": {
+            "max_duration": 300,
+            "max_outputs_per_request": 10,
+            "recommended_duration": 60
+        },
+        "meta": {
+            "max_duration": 600,
+            "max_outputs_per_request": 20,
+            "recommended_duration": 30
+        }
+    },
+    "general": {
+        "min_duration": 1,
+        "max_concurrent_generations": 5,
+        "estimated_time_per_second": 2.0
+    }
+}
+
+
 class AudioService(BaseAssetService):
     """音乐生成服务 - 简化版"""
     
@@ -13,31 +155,15 @@ class AudioService(BaseAssetService):
         return AssetTypeEnum.AUDIO
     
     def get_service_info(self) -> Dict[str, Any]:
-        base_info = super().get_service_info()
-        return {
-            **base_info,
-            "description": "音乐音效生成服务 - 支持Ardianfe和Meta模型",
-            "model_capabilities": self._get_model_capabilities()
-        }
+        # 基类的get_service_info是抽象方法，没有返回值；此处的字典为新建对象，直接写入
+        service_info = super().get_service_info() or {}
+        service_info["description"] = "音乐音效生成服务 - 支持Ardianfe和Meta模型"
+        service_info["model_capabilities"] = dict(self._get_model_capabilities())
+        return service_info
     
-    def _get_model_capabilities(self) -> Dict[str, Any]:
-        """获取模型能力描述"""
-        return {
-            "ardianfe": {
-                "description": "高质量立体声音乐生成",
-                "max_duration": 300,
-                "output_formats": ["wav", "mp3"],
-                "features": ["stereo", "chord_progression", "construction_vibes"],
-                "best_for": ["game_music", "ambient", "electronic"]
-            },
-            "meta": {
-                "description": "Meta MusicGen快速音乐生成",
-                "max_duration": 600,
-                "output_formats": ["wav", "mp3"],
-                "features": ["melody_generation", "multiple_versions", "continuation"],
-                "best_for": ["general_music", "classical", "pop"]
-            }
-        }
+    def _get_model_capabilities(self) -> Mapping[str, Any]:
+        """获取模型能力描述（只读视图）"""
+        return _MODEL_CAPABILITIES
     
     async def generate(
         self, 
@@ -48,12 +174,14 @@ class AudioService(BaseAssetService):
     ) -> List[str]:
         """生成音乐 - 使用基类的模型解析"""
         try:
-            self.logger.info(f"开始生成音乐: {model}", extra={
-                "model": model,
-                "num_outputs": num_outputs,
-                "provider": provider,
-                "params_keys": list(generation_params.keys()) if generation_params else []
-            })
+            # 日志级别过滤掉时跳过extra字典的构建
+            if self.logger.isEnabledFor(logging.INFO):
+                self.logger.info("开始生成音乐: %s", model, extra={
+                    "model": model,
+                    "num_outputs": num_outputs,
+                    "provider": provider,
+                    "params_keys": tuple(generation_params) if generation_params else ()
+                })
             
             # 验证请求
             self.validate_generation_request(model, num_outputs, provider)
@@ -61,14 +189,15 @@ class AudioService(BaseAssetService):
             # 解析模型配置 - 使用基类方法，确保返回正确的model_id字符串
             model_id, provider_name = self.resolve_model_config(model, provider)
             
-            self.logger.debug(f"解析到模型ID: {model_id}", extra={
-                "original_model": model,
-                "provider": provider_name,
-                "resolved_model_id": model_id
-            })
+            if self.logger.isEnabledFor(logging.DEBUG):
+                self.logger.debug("解析到模型ID: %s", model_id, extra={
+                    "original_model": model,
+                    "provider": provider_name,
+                    "resolved_model_id": model_id
+                })
             
-            # 获取AI服务
-            ai_service = ai_service_factory.get_service(ModelProviderEnum(provider_name))
+            # 获取AI服务 - 工厂按提供商名称字符串查找，无需先转换为枚举
+            ai_service = ai_service_factory.get_service(provider_name)
             
             # 预处理生成参数 - 在服务层添加默认值
             processed_params = self._preprocess_generation_params(model, generation_params)
@@ -76,7 +205,7 @@ class AudioService(BaseAssetService):
             # 调用AI服务进行推理 - 传递正确的model_id字符串
             results = await ai_service.batch_inference(model_id, processed_params, num_outputs)
             
-            self.logger.info(f"音乐生成完成: {len(results)}个结果", extra={
+            self.logger.info("音乐生成完成: %d个结果", len(results), extra={
                 "model": model,
                 "model_id": model_id,
                 "provider": provider_name,
@@ -86,7 +215,7 @@ class AudioService(BaseAssetService):
             return results
             
         except Exception as e:
-            self.logger.error(f"音乐生成失败: {str(e)}", extra={
+            self.logger.error("音乐生成失败: %s", e, extra={
                 "model": model,
                 "provider": provider,
                 "error_type": type(e).__name__
@@ -94,80 +223,33 @@ class AudioService(BaseAssetService):
             raise
     
     def _preprocess_generation_params(self, model: str, params: Dict[str, Any]) -> Dict[str, Any]:
-        """预处理生成参数 - 在Service层设置默认值和验证"""
-        processed_params = params.copy()
+        """预处理生成参数 - 在Service层设置默认值和验证
         
+        每次调用只构建一个新字典：参数已包含全部默认项时返回其副本，
+        否则返回与默认值合并的结果；不会修改调用方传入的params
+        """
         # 验证必需参数
-        if "prompt" not in processed_params:
+        if "prompt" not in params:
             raise ValueError(f"{model} 模型缺少必需参数: prompt")
         
-        # 根据不同模型进行参数预处理和设置默认值
-        if model == "ardianfe":
-            self._apply_ardianfe_defaults(processed_params)
-        elif model == "meta":
-            self._apply_meta_defaults(processed_params)
+        # 合并模型默认值，用户传入的参数优先
+        defaults = _DEFAULTS_BY_MODEL.get(model, _COMMON_DEFAULTS)
+        if defaults.keys() <= params.keys():
+            # 参数已包含全部默认项（如重试时重放的参数），无需合并
+            processed_params = dict(params)
         else:
-            # 通用默认值
-            self._apply_common_defaults(processed_params)
+            processed_params = {**defaults, **params}
         
         # 验证参数
         self._validate_common_params(processed_params)
         
         return processed_params
     
-    def _apply_ardianfe_defaults(self, params: Dict[str, Any]) -> None:
-        """应用Ardianfe模型的默认值"""
-        defaults = {
-            "duration": 8,
-            "top_k": 250,
-            "top_p": 0.0,
-            "temperature": 1.0,
-            "continuation": False,
-            "continuation_start": 0,
-            "output_format": "wav",
-            "multi_band_diffusion": False,
-            "normalization_strategy": "loudness",
-            "classifier_free_guidance": 3.0
-        }
-        
-        for key, default_value in defaults.items():
-            params.setdefault(key, default_value)
-    
-    def _apply_meta_defaults(self, params: Dict[str, Any]) -> None:
-        """应用Meta模型的默认值"""
-        defaults = {
-            "duration": 8,
-            "temperature": 1.0,
-            "top_k": 250,
-            "top_p": 0.0,
-            "continuation": False,
-            "continuation_start": 0,
-            "model_version": "stereo-large",
-            "output_format": "mp3",
-            "multi_band_diffusion": False,
-            "normalization_strategy": "peak",
-            "classifier_free_guidance": 3.0
-        }
-        
-        for key, default_value in defaults.items():
-            params.setdefault(key, default_value)
-    
-    def _apply_common_defaults(self, params: Dict[str, Any]) -> None:
-        """应用通用默认值"""
-        defaults = {
-            "duration": 8,
-            "temperature": 1.0,
-            "output_format": "wav"
-        }
-        
-        for key, default_value in defaults.items():
-            params.setdefault(key, default_value)
-    
     def _validate_common_params(self, params: Dict[str, Any]) -> None:
         """验证通用参数"""
         # 时长验证
         duration = params.get("duration", 8)
-        if not isinstance(duration, (int, float)) or duration <= 0:
+        if type(duration) not in _NUMBER_TYPES or duration <= 0:
             raise ValueError(f"duration 必须是正数，当前值: {duration}")
         
         if duration > 600:  # 最大10分钟
@@ -175,84 +257,20 @@ class AudioService(BaseAssetService):
         
         # 温度验证
         temperature = params.get("temperature", 1.0)
-        if not isinstance(temperature, (int, float)) or not (0.1 <= temperature <= 2.0):
+        if type(temperature) not in _NUMBER_TYPES or not (0.1 <= temperature <= 2.0):
             raise ValueError(f"temperature 必须在0.1-2.0之间，当前值: {temperature}")
         
         # 输出格式验证
         output_format = params.get("output_format", "wav")
-        if output_format not in ["wav", "mp3"]:
+        # 先判断类型：不可哈希的值查frozenset会抛TypeError而不是ValueError
+        if not isinstance(output_format, str) or output_format not in _VALID_OUTPUT_FORMATS:
             raise ValueError(f"output_format 必须是 'wav' 或 'mp3'，当前值: {output_format}")
     
-    def get_model_examples(self, model: str) -> Dict[str, Any]:
-        """获取模型的示例参数"""
-        if model == "ardianfe":
-            return {
-                "game_background": {
-                    "prompt": "Epic orchestral music for RPG game battle scene",
-                    "duration": 60,
-                    "temperature": 0.8,
-                    "output_format": "wav"
-                },
-                "ambient_relaxing": {
-                    "prompt": "Peaceful ambient music with nature sounds and soft piano",
-                    "duration": 180,
-                    "temperature": 0.6,
-                    "classifier_free_guidance": 4.0
-                },
-                "electronic_upbeat": {
-                    "prompt": "Energetic electronic dance music with heavy bass",
-                    "duration": 30,
-                    "temperature": 1.2,
-                    "multi_band_diffusion": True
-                }
-            }
-        elif model == "meta":
-            return {
-                "classical_piano": {
-                    "prompt": "Beautiful classical piano melody in C major",
-                    "duration": 45,
-                    "model_version": "melody-large",
-                    "classifier_free_guidance": 3.5
-                },
-                "upbeat_electronic": {
-                    "prompt": "Upbeat electronic dance music with synthesizers",
-                    "duration": 30,
-                    "model_version": "stereo-large",
-                    "temperature": 1.0
-                },
-                "cinematic_orchestral": {
-                    "prompt": "Epic cinematic orchestral score with full orchestra",
-                    "duration": 120,
-                    "model_version": "stereo-melody-large",
-                    "temperature": 0.9
-                }
-            }
-        else:
-            return {}
+    def get_model_examples(self, model: str) -> Mapping[str, Any]:
+        """获取模型的示例参数（只读视图）"""
+        return _EXAMPLES_BY_MODEL.get(model, _NO_EXAMPLES)
     
-    def get_generation_limits(self) -> Dict[str, Any]:
-        """获取生成限制 - 从配置和服务层合并"""
-        base_limits = super().get_generation_limits()
-        
-        # 添加服务层的额外限制
-        service_limits = {
-            "models": {
-                "ardianfe": {
-                    "max_duration": 300,
-                    "max_outputs_per_request": 10,
-                    "recommended_duration": 60
-                },
-                "meta": {
-                    "max_duration": 600,
-                    "max_outputs_per_request": 20,
-                    "recommended_duration": 30
-                }
-            },
-            "general": {
-                "min_duration": 1,
-                "max_concurrent_generations": 5,
-                "estimated_time_per_second": 2.0
-            }
-        }
-        
-        return {**base_limits, **service_limits}
\ No newline at end of file
+    def get_generation_limits(self) -> Mapping[str, Any]:
+        """获取生成限制 - 从配置和服务层合并，返回只读视图"""
+        # 配置返回的是配置中的共享字典，用 | 生成新字典合并，不能原地update
+        return MappingProxyType(super().get_generation_limits() | _SERVICE_LIMITS)
\ No newline at end of file
@@ -1,38 +1,193 @@
 # src/application/services/assets/video_service.py - 修复版
-from typing import Dict, Any, List, Optional
+import asyncio
+import logging
+from types import MappingProxyType
+from typing import Callable, ClassVar, Dict, Any, List, NamedTuple, Optional, Mapping
+
 from src.application.services.assets.core.base_asset_service import BaseAssetService
 from src.application.services.external.ai_service_factory import ai_service_factory
-from src.schemas.enums.asset_enums import AssetTypeEnum, ModelProviderEnum
+from src.schemas.enums.asset_enums import AssetTypeEnum
 from src.infrastructure.decorators.retry import simple_retry
 
 
+# 十六进制颜色允许的字符
+_HEX_DIGITS = frozenset("0123456789abcdefABCDEF")
+
+# 模型能力描述
+_MODEL_CAPABILITIES = MappingProxyType({
+    "background_removal": {
+        "description": "智能视频背景移除和替换",
+        "input_formats": ["mp4", "avi", "mov", "mkv", "webm"],
+        "output_format": "mp4",
+        "max_duration": 300,
+        "max_file_size": "100MB",
+        "features": ["smart_detection", "edge_refinement", "color_replacement", "batch_processing"],
+        "best_for": ["video_conferencing", "content_creation", "professional_editing"]
+    }
+})
+
+# 各模型的示例参数
+_BACKGROUND_REMOVAL_EXAMPLES = MappingProxyType({
+    "portrait_video": {
+        "video": "https://example.com/portrait_video.mp4",
+        "mode": "Normal",
+        "description": "人物肖像视频背景移除"
+    },
+    "presentation_video": {
+        "video": "https://example.com/presentation.mp4",
+        "mode": "Fast",
+        "background_color": "#FFFFFF",
+        "description": "演示视频快速背景移除并替换为白色"
+    },
+    "green_screen_alternative": {
+        "video": "https://example.com/person_talking.mp4",
+        "mode": "Normal",
+        "background_color": "#00FF00",
+        "description": "生成绿幕效果，便于后期合成"
+    },
+    "transparent_background": {
+        "video": "https://example.com/dancer.mp4",
+        "mode": "Normal",
+        "description": "保持透明背景，便于叠加其他素材"
+    }
+})
+
+# 模型 -> 示例参数
+_EXAMPLES_BY_MODEL = MappingProxyType({
+    "background_removal": _BACKGROUND_REMOVAL_EXAMPLES
+})
+
+# 未配置示例的模型返回的空视图
+_NO_EXAMPLES = MappingProxyType({})
+
+# 视频URL允许的协议前缀
+_URL_SCHEMES = ("http://", "https://")
+
+# 支持的处理模式（元组保留展示顺序，frozenset用于校验）
+_MODE_OPTIONS = ("Fast", "Normal")
+_VALID_MODES = frozenset(_MODE_OPTIONS)
+
+# 参数规则中的缺省值标记：必填 / 可选且没有默认值
+_REQUIRED = object()
+_OPTIONAL = object()
+
+
+def _is_video_url(value: Any) -> bool:
+    return bool(value) and value.startswith(_URL_SCHEMES)
+
+
+def _is_valid_mode(mode: Any) -> bool:
+    # 先判断类型：列表等不可哈希的值查frozenset会抛TypeError，应与其他非法值一样报ValueError
+    return isinstance(mode, str) and mode in _VALID_MODES
+
+
+def _is_valid_color(color: Any) -> bool:
+    """#RRGGBB格式，逐字符查表，不经过int解析和异常；空值表示不替换背景"""
+    # 不用bytes.fromhex：它会跳过空白，"#1234  "这样的值也能解析通过
+    return not color or (len(color) == 7 and color[0] == "#" and _HEX_DIGITS.issuperset(color[1:]))
+
+
+class _ParamRule(NamedTuple):
+    """单个参数的预处理规则"""
+    key: str
+    default: Any                                  # 缺省值，或_REQUIRED / _OPTIONAL
+    check: Optional[Callable[[Any], bool]]        # 用户传入值的校验，默认值不再校验
+    error: str                                    # 校验失败信息，{}处填入当前值
+    missing_error: str = ""                       # 必填参数缺失时的信息
+
+
+_VIDEO_RULE = _ParamRule("video", _OPTIONAL, _is_video_url, "视频URL必须以http://或https://开头")
+_MODE_RULE = _ParamRule(
+    "mode", "Normal", _is_valid_mode, f"处理模式必须是{list(_MODE_OPTIONS)}之一，当前值: {{}}"
+)
+_BACKGROUND_COLOR_RULE = _ParamRule(
+    "background_color", _OPTIONAL, _is_valid_color, "背景颜色格式无效，应为十六进制格式如#FFFFFF，当前值: {}"
+)
+
+# 模型 -> 参数规则，预处理时按规则顺序对参数只走一遍
+_PARAM_SCHEMAS = {
+    "background_removal": (
+        _VIDEO_RULE._replace(default=_REQUIRED, missing_error="背景移除模型缺少必需参数: video"),
+        _MODE_RULE,
+        _BACKGROUND_COLOR_RULE
+    )
+}
+
+# 未单独配置的模型使用的通用规则
+_COMMON_SCHEMA = (
+    _VIDEO_RULE,
+    _MODE_RULE,
+    _ParamRule("output_format", "mp4", None, ""),
+    _BACKGROUND_COLOR_RULE
+)
+
+# 服务层的额外生成限制
+_SERVICE_LIMITS = {
+    "models": {
+        "background_removal": {
+            "max_duration": 300,
+            "max_file_size_mb": 100,
+            "max_outputs_per_request": 5,
+            "supported_formats": ["mp4", "avi", "mov", "mkv", "webm"],
+            "output_format": "mp4"
+        }
+    },
+    "general": {
+        "max_concurrent_processing": 3,
+        "estimated_time_multiplier": 2.0,  # 处理时间约为视频时长的2倍
+        "supported_resolutions": ["720p", "1080p"],
+        "max_resolution": "1920x1080"
+    }
+}
+
+# 支持的视频格式和规格
+_SUPPORTED_FORMATS = MappingProxyType({
+    "input_formats": {
+        "supported": ["mp4", "avi", "mov", "mkv", "webm", "flv"],
+        "recommended": "mp4",
+        "codec_preferences": ["H.264", "H.265"]
+    },
+    "output_formats": {
+        "supported": ["mp4", "webm"],
+        "default": "mp4",
+        "codec": "H.264"
+    },
+    "specifications": {
+        "max_resolution": "1920x1080",
+        "max_duration_seconds": 300,
+        "max_file_size_mb": 100,
+        "supported_frame_rates": [24, 25, 30, 60],
+        "recommended_bitrate": "2-8 Mbps"
+    },
+    "processing_limits": {
+        "max_concurrent_jobs": 3,
+        "average_processing_time": "1-3x video duration",
+        "queue_timeout": "15 minutes"
+    }
+})
+
+
 class VideoService(BaseAssetService):
     """视频处理服务 - 修复版"""
     
+    # 处理器每个请求都会新建服务实例，并发限制需在进程内共享，因此信号量保存在类上；
+    # 信号量绑定首次使用它的事件循环，按当前循环创建（见_processing_semaphore）
+    _semaphore: ClassVar[Optional[asyncio.Semaphore]] = None
+    _semaphore_loop: ClassVar[Optional[asyncio.AbstractEventLoop]] = None
+    
     def get_asset_type(self) -> AssetTypeEnum:
         return AssetTypeEnum.VIDEO
     
     def get_service_info(self) -> Dict[str, Any]:
-        base_info = super().get_service_info()
-        return {
-            **base_info,
-            "description": "视频处理服务 - 支持背景移除等功能",
-            "model_capabilities": self._get_model_capabilities()
-        }
+        # 基类的get_service_info是抽象方法，没有返回值；此处的字典为新建对象，直接写入
+        service_info = super().get_service_info() or {}
+        service_info["description"] = "视频处理服务 - 支持背景移除等功能"
+        service_info["model_capabilities"] = dict(self._get_model_capabilities())
+        return service_info
     
-    def _get_model_capabilities(self) -> Dict[str, Any]:
-        """获取模型能力描述"""
-        return {
-            "background_removal": {
-                "description": "智能视频背景移除和替换",
-                "input_formats": ["mp4", "avi", "mov", "mkv", "webm"],
-                "output_format": "mp4",
-                "max_duration": 300,
-                "max_file_size": "100MB",
-                "features": ["smart_detection", "edge_refinement", "color_replacement", "batch_processing"],
-                "best_for": ["video_conferencing", "content_creation", "professional_editing"]
-            }
-        }
+    def _get_model_capabilities(self) -> Mapping[str, Any]:
+        """获取模型能力描述（只读视图）"""
+        return _MODEL_CAPABILITIES
     
     async def generate(
         self, 
@@ -43,12 +198,14 @@ class VideoService(BaseAssetService):
     ) -> List[str]:
         """处理视频 - 使用基类的模型解析"""
         try:
-            self.logger.info(f"开始处理视频: {model}", extra={
-                "model": model,
-                "num_outputs": num_outputs,
-                "provider": provider,
-                "params_keys": list(generation_params.keys()) if generation_params else []
-            })
+            # 日志级别过滤掉时跳过extra字典的构建
+            if self.logger.isEnabledFor(logging.INFO):
+                self.logger.info("开始处理视频: %s", model, extra={
+                    "model": model,
+                    "num_outputs": num_outputs,
+                    "provider": provider,
+                    "params_keys": tuple(generation_params) if generation_params else ()
+                })
             
             # 验证请求
             self.validate_generation_request(model, num_outputs, provider)
@@ -56,22 +213,23 @@ class VideoService(BaseAssetService):
             # 解析模型配置 - 使用基类方法，确保返回正确的model_id字符串
             model_id, provider_name = self.resolve_model_config(model, provider)
             
-            self.logger.debug(f"解析到模型ID: {model_id}", extra={
-                "original_model": model,
-                "provider": provider_name,
-                "resolved_model_id": model_id
-            })
+            if self.logger.isEnabledFor(logging.DEBUG):
+                self.logger.debug("解析到模型ID: %s", model_id, extra={
+                    "original_model": model,
+                    "provider": provider_name,
+                    "resolved_model_id": model_id
+                })
             
-            # 获取AI服务
-            ai_service = ai_service_factory.get_service(ModelProviderEnum(provider_name))
+            # 获取AI服务 - 工厂按提供商名称字符串查找，无需先转换为枚举
+            ai_service = ai_service_factory.get_service(provider_name)
             
             # 预处理生成参数
             processed_params = self._preprocess_generation_params(model, generation_params)
             
             # 调用AI服务进行推理 - 传递正确的model_id字符串
-            results = await ai_service.batch_inference(model_id, processed_params, num_outputs)
+            results = await self._parallel_inference(ai_service, model_id, processed_params, num_outputs)
             
-            self.logger.info(f"视频处理完成: {len(results)}个结果", extra={
+            self.logger.info("视频处理完成: %d个结果", len(results), extra={
                 "model": model,
                 "model_id": model_id,
                 "provider": provider_name,
@@ -81,84 +239,74 @@ class VideoService(BaseAssetService):
             return results
             
         except Exception as e:
-            self.logger.error(f"视频处理失败: {str(e)}", extra={
+            self.logger.error("视频处理失败: %s", e, extra={
                 "model": model,
                 "provider": provider,
                 "error_type": type(e).__name__
             })
             raise
     
-    def _preprocess_generation_params(self, model: str, params: Dict[str, Any]) -> Dict[str, Any]:
-        """预处理生成参数 - 在Service层设置默认值和验证"""
-        processed_params = params.copy()
+    @property
+    def _processing_semaphore(self) -> asyncio.Semaphore:
+        """当前事件循环的视频处理并发信号量
         
-        # 根据不同模型进行参数预处理
-        if model == "background_removal":
-            self._apply_background_removal_defaults(processed_params)
-        else:
-            # 通用默认值
-            self._apply_common_defaults(processed_params)
+        循环变化时（如同步包装中的asyncio.run）为新循环重建信号量
+        """
+        loop = asyncio.get_running_loop()
+        cls = type(self)
+        if cls._semaphore is None or cls._semaphore_loop is not loop:
+            cls._semaphore = asyncio.Semaphore(self.get_generation_limits()["general"]["max_concurrent_processing"])
+            cls._semaphore_loop = loop
+        return cls._semaphore
+    
+    async def _parallel_inference(
+        self,
+        ai_service: Any,
+        model_id: str,
+        params: Dict[str, Any],
+        num_outputs: int
+    ) -> List[str]:
+        """并发执行多次单次推理，并发数受服务层max_concurrent_processing限制
         
-        # 验证参数
-        self._validate_common_params(processed_params)
+        提供商没有单次推理接口时退回其batch_inference
+        """
+        run_inference = getattr(ai_service, "run_inference", None)
+        if run_inference is None:
+            return await ai_service.batch_inference(model_id, params, num_outputs)
         
-        return processed_params
-    
-    def _apply_background_removal_defaults(self, params: Dict[str, Any]) -> None:
-        """应用背景移除模型的默认值"""
-        # 验证必需参数
-        if "video" not in params:
-            raise ValueError("背景移除模型缺少必需参数: video")
+        semaphore = self._processing_semaphore
         
-        defaults = {
-            "mode": "Normal"
-        }
+        async def _run_one(output_index: int) -> Optional[str]:
+            async with semaphore:
+                try:
+                    return await run_inference(model_id, params)
+                except Exception as e:
+                    # 与batch_inference一致：单个输出失败只记录日志，不影响其他输出
+                    self.logger.error(f"处理第{output_index + 1}个输出失败: {str(e)}")
+                    return None
         
-        for key, default_value in defaults.items():
-            params.setdefault(key, default_value)
+        results = await asyncio.gather(*(_run_one(i) for i in range(num_outputs)))
+        return [result for result in results if result is not None]
     
-    def _apply_common_defaults(self, params: Dict[str, Any]) -> None:
-        """应用通用默认值"""
-        defaults = {
-            "mode": "Normal",
-            "output_format": "mp4"
-        }
+    def _preprocess_generation_params(self, model: str, params: Dict[str, Any]) -> Dict[str, Any]:
+        """预处理生成参数 - 在Service层设置默认值和验证
         
-        for key, default_value in defaults.items():
-            params.setdefault(key, default_value)
-    
-    def _validate_common_params(self, params: Dict[str, Any]) -> None:
-        """验证通用参数"""
-        # 验证视频URL格式
-        if "video" in params:
-            video_url = params["video"]
-            if not video_url or not video_url.startswith(("http://", "https://")):
-                raise ValueError("视频URL必须以http://或https://开头")
+        按模型的参数规则走一遍：必填检查、填充默认值和校验在同一次遍历中完成；
+        规则之外的参数原样保留，不会修改调用方传入的params
+        """
+        processed_params = dict(params)
         
-        # 验证处理模式
-        if "mode" in params:
-            mode = params["mode"]
-            valid_modes = ["Fast", "Normal"]
-            if mode not in valid_modes:
-                raise ValueError(f"处理模式必须是{valid_modes}之一，当前值: {mode}")
+        for key, default, check, error, missing_error in _PARAM_SCHEMAS.get(model, _COMMON_SCHEMA):
+            value = processed_params.get(key, _OPTIONAL)
+            if value is _OPTIONAL:
+                if default is _REQUIRED:
+                    raise ValueError(missing_error)
+                if default is not _OPTIONAL:
+                    processed_params[key] = default
+            elif check is not None and not check(value):
+                raise ValueError(error.format(value))
         
-        # 验证背景颜色格式（如果提供）
-        if "background_color" in params and params["background_color"]:
-            background_color = params["background_color"]
-            if not self._is_valid_color(background_color):
-                raise ValueError(f"背景颜色格式无效，应为十六进制格式如#FFFFFF，当前值: {background_color}")
-    
-    def _is_valid_color(self, color: str) -> bool:
-        """验证颜色格式是否有效"""
-        if not color.startswith("#"):
-            return False
-        if len(color) != 7:
-            return False
-        try:
-            int(color[1:], 16)
-            return True
-        except ValueError:
-            return False
+        return processed_params
     
     async def remove_background(
         self, 
@@ -185,84 +333,15 @@ class VideoService(BaseAssetService):
         
         return results[0] if results else None
     
-    def get_model_examples(self, model: str) -> Dict[str, Any]:
-        """获取模型的示例参数"""
-        if model == "background_removal":
-            return {
-                "portrait_video": {
-                    "video": "https://example.com/portrait_video.mp4",
-                    "mode": "Normal",
-                    "description": "人物肖像视频背景移除"
-                },
-                "presentation_video": {
-                    "video": "https://example.com/presentation.mp4",
-                    "mode": "Fast",
-                    "background_color": "#FFFFFF",
-                    "description": "演示视频快速背景移除并替换为白色"
-                },
-                "green_screen_alternative": {
-                    "video": "https://example.com/person_talking.mp4",
-                    "mode": "Normal",
-                    "background_color": "#00FF00",
-                    "description": "生成绿幕效果，便于后期合成"
-                },
-                "transparent_background": {
-                    "video": "https://example.com/dancer.mp4",
-                    "mode": "Normal",
-                    "description": "保持透明背景，便于叠加其他素材"
-                }
-            }
-        else:
-            return {}
+    def get_model_examples(self, model: str) -> Mapping[str, Any]:
+        """获取模型的示例参数（只读视图）"""
+        return _EXAMPLES_BY_MODEL.get(model, _NO_EXAMPLES)
     
-    def get_generation_limits(self) -> Dict[str, Any]:
-        """获取生成限制 - 从配置和服务层合并"""
-        base_limits = super().get_generation_limits()
-        
-        # 添加服务层的额外限制
-        service_limits = {
-            "models": {
-                "background_removal": {
-                    "max_duration": 300,
-                    "max_file_size_mb": 100,
-                    "max_outputs_per_request": 5,
-                    "supported_formats": ["mp4", "avi", "mov", "mkv", "webm"],
-                    "output_format": "mp4"
-                }
-            },
-            "general": {
-                "max_concurrent_processing": 3,
-                "estimated_time_multiplier": 2.0,  # 处理时间约为视频时长的2倍
-                "supported_resolutions": ["720p", "1080p"],
-                "max_resolution": "1920x1080"
-            }
-        }
-        
-        return {**base_limits, **service_limits}
+    def get_generation_limits(self) -> Mapping[str, Any]:
+        """获取生成限制 - 从配置和服务层合并，返回只读视图"""
+        # 配置返回的是配置中的共享字典，用 | 生成新字典合并，不能原地update
+        return MappingProxyType(super().get_generation_limits() | _SERVICE_LIMITS)
     
-    def get_supported_formats(self) -> Dict[str, Any]:
-        """获取支持的视频格式和规格"""
-        return {
-            "input_formats": {
-                "supported": ["mp4", "avi", "mov", "mkv", "webm", "flv"],
-                "recommended": "mp4",
-                "codec_preferences": ["H.264", "H.265"]
-            },
-            "output_formats": {
-                "supported": ["mp4", "webm"],
-                "default": "mp4",
-                "codec": "H.264"
-            },
-            "specifications": {
-                "max_resolution": "1920x1080",
-                "max_duration_seconds": 300,
-                "max_file_size_mb": 100,
-                "supported_frame_rates": [24, 25, 30, 60],
-                "recommended_bitrate": "2-8 Mbps"
-            },
-            "processing_limits": {
-                "max_concurrent_jobs": 3,
-                "average_processing_time": "1-3x video duration",
-                "queue_timeout": "15 minutes"
-            }
-        }
\ No newline at end of file
+    def get_supported_formats(self) -> Mapping[str, Any]:
+        """获取支持的视频格式和规格（只读视图）"""
+        return _SUPPORTED_FORMATS
\ No newline at end of file
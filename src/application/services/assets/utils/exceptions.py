@@ -1,9 +1,20 @@
 # src/application/services/assets/utils/exceptions.py
-from typing import Any, Dict, Optional
+from typing import Any, Dict, Iterable, Optional
+
+
+def _rebuild_exception(cls, args: tuple, state: Dict[str, Any]) -> "AssetServiceException":
+    """按实例属性还原异常，不重新调用子类的__init__（子类构造参数与args不一致）"""
+    exc = cls.__new__(cls, *args)
+    exc.__dict__.update(state)
+    return exc
 
 
 class AssetServiceException(Exception):
-    """美术资源服务基础异常"""
+    """美术资源服务基础异常
+    
+    details可以直接传入；子类只保存字段值，由_build_details在首次读取details时构建字典：
+    异常常在校验路径上被捕获后丢弃，不读取时不生成字典
+    """
     
     def __init__(
         self, 
@@ -13,8 +24,24 @@ class AssetServiceException(Exception):
     ):
         self.message = message
         self.error_code = error_code
-        self.details = details or {}
+        self._details = details
         super().__init__(self.message)
+    
+    def _build_details(self) -> Dict[str, Any]:
+        return {}
+    
+    @property
+    def details(self) -> Dict[str, Any]:
+        if self._details is None:
+            self._details = self._build_details()
+        return self._details
+    
+    @details.setter
+    def details(self, value: Dict[str, Any]) -> None:
+        self._details = value
+    
+    def __reduce__(self):
+        return _rebuild_exception, (type(self), self.args, self.__dict__)
 
 
 class ModelNotFoundError(AssetServiceException):
@@ -25,14 +52,15 @@ class ModelNotFoundError(AssetServiceException):
         if available_models:
             message += f"，可用模型: {', '.join(available_models)}"
         
-        super().__init__(
-            message=message,
-            error_code="MODEL_NOT_FOUND",
-            details={
-                "model_name": model_name,
-                "available_models": available_models or []
-            }
-        )
+        self.model_name = model_name
+        self.available_models = available_models
+        super().__init__(message=message, error_code="MODEL_NOT_FOUND")
+    
+    def _build_details(self) -> Dict[str, Any]:
+        return {
+            "model_name": self.model_name,
+            "available_models": self.available_models or []
+        }
 
 
 class GenerationFailedError(AssetServiceException):
@@ -41,15 +69,17 @@ class GenerationFailedError(AssetServiceException):
     def __init__(self, model: str, reason: str, details: Optional[Dict[str, Any]] = None):
         message = f"使用模型 {model} 生成失败: {reason}"
         
-        super().__init__(
-            message=message,
-            error_code="GENERATION_FAILED",
-            details={
-                **(details or {}),
-                "model": model,
-                "reason": reason
-            }
-        )
+        self.model = model
+        self.reason = reason
+        self.extra_details = details
+        super().__init__(message=message, error_code="GENERATION_FAILED")
+    
+    def _build_details(self) -> Dict[str, Any]:
+        return {
+            **(self.extra_details or {}),
+            "model": self.model,
+            "reason": self.reason
+        }
 
 
 class ValidationError(AssetServiceException):
@@ -58,15 +88,17 @@ class ValidationError(AssetServiceException):
     def __init__(self, field: str, message: str, value: Any = None):
         full_message = f"字段验证失败 {field}: {message}"
         
-        super().__init__(
-            message=full_message,
-            error_code="VALIDATION_ERROR",
-            details={
-                "field": field,
-                "validation_message": message,
-                "value": value
-            }
-        )
+        self.field = field
+        self.validation_message = message
+        self.value = value
+        super().__init__(message=full_message, error_code="VALIDATION_ERROR")
+    
+    def _build_details(self) -> Dict[str, Any]:
+        return {
+            "field": self.field,
+            "validation_message": self.validation_message,
+            "value": self.value
+        }
 
 
 class ConfigurationError(AssetServiceException):
@@ -75,14 +107,15 @@ class ConfigurationError(AssetServiceException):
     def __init__(self, config_key: str, message: str):
         full_message = f"配置错误 {config_key}: {message}"
         
-        super().__init__(
-            message=full_message,
-            error_code="CONFIGURATION_ERROR",
-            details={
-                "config_key": config_key,
-                "config_message": message
-            }
-        )
+        self.config_key = config_key
+        self.config_message = message
+        super().__init__(message=full_message, error_code="CONFIGURATION_ERROR")
+    
+    def _build_details(self) -> Dict[str, Any]:
+        return {
+            "config_key": self.config_key,
+            "config_message": self.config_message
+        }
 
 
 class ProviderError(AssetServiceException):
@@ -91,33 +124,38 @@ class ProviderError(AssetServiceException):
     def __init__(self, provider: str, message: str, status_code: Optional[int] = None):
         full_message = f"AI服务商 {provider} 错误: {message}"
         
-        super().__init__(
-            message=full_message,
-            error_code="PROVIDER_ERROR",
-            details={
-                "provider": provider,
-                "provider_message": message,
-                "status_code": status_code
-            }
-        )
+        self.provider = provider
+        self.provider_message = message
+        self.status_code = status_code
+        super().__init__(message=full_message, error_code="PROVIDER_ERROR")
+    
+    def _build_details(self) -> Dict[str, Any]:
+        return {
+            "provider": self.provider,
+            "provider_message": self.provider_message,
+            "status_code": self.status_code
+        }
 
 
 class BatchProcessingError(AssetServiceException):
     """批量处理错误异常"""
     
-    def __init__(self, total: int, failed: int, errors: list):
+    def __init__(self, total: int, failed: int, errors: Iterable[Any]):
         message = f"批量处理部分失败: {failed}/{total} 项失败"
         
-        super().__init__(
-            message=message,
-            error_code="BATCH_PROCESSING_ERROR",
-            details={
-                "total_count": total,
-                "failed_count": failed,
-                "success_count": total - failed,
-                "errors": errors
-            }
-        )
+        self.total = total
+        self.failed = failed
+        # 错误明细固定为元组：不可变、比列表小，已是元组时不再复制
+        self.errors = errors if isinstance(errors, tuple) else tuple(errors)
+        super().__init__(message=message, error_code="BATCH_PROCESSING_ERROR")
+    
+    def _build_details(self) -> Dict[str, Any]:
+        return {
+            "total_count": self.total,
+            "failed_count": self.failed,
+            "success_count": self.total - self.failed,
+            "errors": self.errors
+        }
 
 
 class ResourceNotFoundError(AssetServiceException):
@@ -126,14 +164,15 @@ class ResourceNotFoundError(AssetServiceException):
     def __init__(self, resource_type: str, resource_id: str):
         message = f"{resource_type} 未找到: {resource_id}"
         
-        super().__init__(
-            message=message,
-            error_code="RESOURCE_NOT_FOUND",
-            details={
-                "resource_type": resource_type,
-                "resource_id": resource_id
-            }
-        )
+        self.resource_type = resource_type
+        self.resource_id = resource_id
+        super().__init__(message=message, error_code="RESOURCE_NOT_FOUND")
+    
+    def _build_details(self) -> Dict[str, Any]:
+        return {
+            "resource_type": self.resource_type,
+            "resource_id": self.resource_id
+        }
 
 
 class StorageError(AssetServiceException):
@@ -142,12 +181,14 @@ class StorageError(AssetServiceException):
     def __init__(self, operation: str, message: str, storage_type: str = "unknown"):
         full_message = f"存储操作失败 {operation}: {message}"
         
-        super().__init__(
-            message=full_message,
-            error_code="STORAGE_ERROR",
-            details={
-                "operation": operation,
-                "storage_type": storage_type,
-                "storage_message": message
-            }
-        )
\ No newline at end of file
+        self.operation = operation
+        self.storage_type = storage_type
+        self.storage_message = message
+        super().__init__(message=full_message, error_code="STORAGE_ERROR")
+    
+    def _build_details(self) -> Dict[str, Any]:
+        return {
+            "operation": self.operation,
+            "storage_type": self.storage_type,
+            "storage_message": self.storage_message
+        }
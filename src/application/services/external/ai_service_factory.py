@@ -1,60 +1,116 @@
 # src/application/services/external/ai_service_factory.py (更新版)
-from typing import Dict, Any, List
+from enum import Enum
+from functools import cached_property, partial
+from typing import Callable, Dict, Any, List, Tuple, Union
 from src.infrastructure.logging.logger import get_logger
+from src.infrastructure.cache.cache_interface import InMemoryCache
 from src.application.config.ai.ai_settings import get_ai_settings
 
 logger = get_logger(__name__)
 
+
+# 各提供商服务的构建函数 - 在函数内导入，只有用到的提供商才会加载对应模块
+def _build_replicate_service():
+    from src.application.services.external.replicate_service import ReplicateService
+    return ReplicateService()
+
+
+def _build_openai_service():
+    from src.application.services.external.openai_service import OpenAIService
+    return OpenAIService()
+
+
+def _build_unimplemented_service(display_name: str):
+    # TODO: 实现Stability、Anthropic服务
+    raise NotImplementedError(f"{display_name}服务尚未实现")
+
+
+# 提供商名称 -> 服务构建函数；构建成功的实例由工厂缓存，每个提供商只导入和构建一次
+_BUILDERS: Dict[str, Callable[[], Any]] = {
+    "replicate": _build_replicate_service,
+    "openai": _build_openai_service,
+    "stability": partial(_build_unimplemented_service, "Stability"),
+    "anthropic": partial(_build_unimplemented_service, "Anthropic")
+}
+
+
 class AIServiceFactory:
     """AI服务工厂 - 更新版，基于独立的AI配置"""
     
     def __init__(self):
-        self.ai_settings = get_ai_settings()
+        # 模块导入时只创建空容器；读取AI配置推迟到第一次使用，缩短冷启动
         self._services: Dict[str, Any] = {}
+        # (provider, model) -> 是否可用；失败结果同样缓存，避免反复构建初始化失败的服务
+        self._validate_cache = InMemoryCache(max_size=512, default_ttl=300)
         logger.info("AI服务工厂初始化完成")
     
-    def get_service(self, provider: str):
+    @cached_property
+    def ai_settings(self):
+        return get_ai_settings()
+    
+    @cached_property
+    def _enabled_providers(self) -> Tuple[str, ...]:
+        # 启用的提供商取决于配置和环境变量，配置对象本身已缓存，这里只计算一次
+        return tuple(self.ai_settings.get_enabled_providers())
+    
+    @cached_property
+    def _enabled(self) -> frozenset:
+        return frozenset(self._enabled_providers)
+    
+    def get_service(self, provider: Union[str, Enum]):
         """
         获取AI服务实例
         
         Args:
-            provider: 提供商名称 (如: "openai", "replicate")
+            provider: 提供商名称 (如: "openai", "replicate")，也可直接传ModelProviderEnum
         """
+        # 枚举统一转换为名称字符串，缓存键和错误信息都使用纯字符串
+        if isinstance(provider, Enum):
+            provider = provider.value
+        
         # 检查提供商是否启用
-        if provider not in self.ai_settings.get_enabled_providers():
-            available_providers = self.ai_settings.get_enabled_providers()
-            raise ValueError(f"AI提供商 {provider} 未启用。可用提供商: {available_providers}")
+        service = self._services.get(provider)
+        if service is not None:
+            return service
         
-        if provider not in self._services:
-            self._services[provider] = self._create_service(provider)
+        if provider not in self._enabled:
+            raise ValueError(f"AI提供商 {provider} 未启用。可用提供商: {list(self._enabled_providers)}")
         
-        return self._services[provider]
+        service = self._services[provider] = self._create_service(provider)
+        return service
     
     def _create_service(self, provider: str):
         """创建AI服务实例"""
-        if provider == "replicate":
-            from src.application.services.external.replicate_service import ReplicateService
-            return ReplicateService()
-        elif provider == "openai":
-            from src.application.services.external.openai_service import OpenAIService
-            return OpenAIService()
-        elif provider == "stability":
-            # TODO: 实现Stability服务
-            raise NotImplementedError(f"Stability服务尚未实现")
-        elif provider == "anthropic":
-            # TODO: 实现Anthropic服务
-            raise NotImplementedError(f"Anthropic服务尚未实现")
-        else:
-            available_providers = self.ai_settings.get_enabled_providers()
-            raise ValueError(f"不支持的AI服务提供商: {provider}。可用提供商: {available_providers}")
+        builder = _BUILDERS.get(provider)
+        if builder is None:
+            raise ValueError(f"不支持的AI服务提供商: {provider}。可用提供商: {list(self._enabled_providers)}")
+        return builder()
     
-    def get_available_providers(self) -> list[str]:
-        """获取可用的提供商列表"""
-        return self.ai_settings.get_enabled_providers()
+    async def aclose(self) -> None:
+        """关闭已创建服务持有的连接池，应用关闭时调用"""
+        for provider, service in self._services.items():
+            aclose = getattr(service, "aclose", None)
+            if aclose is None:
+                continue
+            try:
+                await aclose()
+            except Exception as e:
+                logger.warning(f"关闭提供商 {provider} 的服务失败: {str(e)}")
     
-    def get_all_available_models(self) -> Dict[str, List[str]]:
-        """获取所有可用模型"""
-        return self.ai_settings.get_all_available_models()
+    def get_available_providers(self) -> Tuple[str, ...]:
+        """获取可用的提供商列表 - 只读元组，与启用集合一样只在初始化时计算"""
+        return self._enabled_providers
+    
+    @cached_property
+    def _all_available_models(self) -> Dict[str, Tuple[str, ...]]:
+        return {
+            provider: tuple(models)
+            for provider, models in self.ai_settings.get_all_available_models().items()
+        }
+    
+    def get_all_available_models(self) -> Dict[str, Tuple[str, ...]]:
+        """获取所有可用模型 - 结果只构建一次，调用方不应修改"""
+        return self._all_available_models
     
     def get_provider_info(self, provider: str) -> Dict[str, Any]:
         """获取提供商信息"""
@@ -70,11 +126,19 @@ class AIServiceFactory:
     
     def validate_model(self, provider: str, model: str) -> bool:
         """验证模型是否可用"""
+        cache_key = f"{provider}:{model}"
+        is_valid = self._validate_cache.get_sync(cache_key)
+        if is_valid is not None:
+            return is_valid
+        
         try:
             service = self.get_service(provider)
-            return service.validate_model(model)
+            is_valid = service.validate_model(model)
         except Exception:
-            return False
+            is_valid = False
+        
+        self._validate_cache.set_sync(cache_key, is_valid)
+        return is_valid
     
     def get_models_by_capability(self, capability: str) -> Dict[str, List[str]]:
         """根据能力获取模型"""
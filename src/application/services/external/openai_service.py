@@ -1,11 +1,54 @@
 # src/application/services/external/openai_service.py (优化版)
 import asyncio
-import base64
-import requests
-from typing import Dict, Any, List, Optional, Union
+import json
+import logging
+import weakref
+from datetime import datetime, timezone
+
+import httpx
+from typing import Dict, Any, List, Optional, Set, Tuple, Union
 
 from src.application.services.service_interface import BaseService
 from src.application.config.ai.ai_settings import get_ai_settings
+from src.infrastructure.cache.cached_runner import CachedRunner
+
+try:
+    # pybase64使用SIMD实现，大块数据编码明显更快；未安装时使用标准库
+    from pybase64 import b64encode as _b64encode
+except ImportError:
+    from base64 import b64encode as _b64encode
+
+try:
+    import orjson
+except ImportError:  # orjson为可选依赖，未安装时回退httpx内置的标准库json
+    orjson = None
+
+# 下载图像时每块的字节数，取3的倍数使每块都能独立完成base64编码
+_DOWNLOAD_CHUNK_SIZE = 57 * 1024
+
+# 追加到提示词的参考信息：(input_data键, 模板)，按此顺序拼接
+_REFERENCE_PROMPT_TEMPLATES = (
+    ("reference_image_description", "Reference style: {}"),
+    ("style_guidance", "Style guidance: {}"),
+    ("reference_prompt", "Reference asset: {}")
+)
+
+# 支持JSON响应模式（response_format=json_object）的模型
+_JSON_MODE_MODELS = frozenset({"gpt-4o", "gpt-4-turbo", "gpt-3.5-turbo"})
+
+# 可重试的响应状态：只有限流和服务端临时错误；生成接口不幂等，409等冲突类状态不重试，避免重复生成
+_RETRYABLE_STATUS = frozenset({429, 500, 502, 503, 504})
+
+# 重试退避（秒）：初始间隔和上限，与官方SDK的默认值一致
+_RETRY_INITIAL_DELAY = 0.5
+_RETRY_MAX_DELAY = 8.0
+
+# 服务端Retry-After的上限（秒），避免异常值让请求长时间挂起
+_RETRY_AFTER_MAX_DELAY = 60.0
+
+# input_data中控制是否使用推理结果缓存的键，不会发送给API
+_CACHE_OPTION_KEY = "_cache"
+
 
 class OpenAIService(BaseService):
     """OpenAI服务 - 优化版，支持多图片输入和代码简化"""
@@ -23,10 +66,49 @@ class OpenAIService(BaseService):
         
         self.api_host = openai_config.get("api_host", "https://api.openai.com/v1")
         self.timeout = openai_config.get("timeout", 120)
+        self.max_retries = openai_config.get("max_retries", 3)
+        
+        # 文本请求的合并窗口：窗口内请求体相同的调用合并为一次请求（n个候选），默认0不合并，需在配置中开启
+        self.batch_window = openai_config.get("batch_window_ms", 0) / 1000
+        self.max_batch_size = openai_config.get("max_batch_size", 16)
+        self._pending_text_groups: Dict[str, Tuple[Dict[str, Any], List[asyncio.Future]]] = {}
+        # 定时器和等待中的Future都绑定创建它们的事件循环，记录所属循环以便循环更换时重置
+        self._text_flush_handle: Optional[asyncio.TimerHandle] = None
+        self._text_flush_loop: Optional[asyncio.AbstractEventLoop] = None
+        self._text_batch_tasks: Set[asyncio.Task] = set()
+        
+        # 相同模型+输入的推理结果缓存，需在input_data中传入_cache=True启用
+        self._inference_cache = CachedRunner(openai_config.get("inference_cache_size", 1024))
+        
+        # 复用的异步HTTP客户端：连接池保持长连接，避免每次请求重新握手，也不再占用线程池
+        # 认证头按请求传入，下载生成结果等外部URL时不会带上API密钥
+        # 连接池绑定创建它的事件循环，因此按循环分别创建并保存（见_http），循环被回收时对应条目自动移除
+        self._http_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncClient]" = (
+            weakref.WeakKeyDictionary()
+        )
+        self._headers = self._prepare_request_headers()
         
         # 从AI配置获取支持的模型
         self.available_models = self.ai_settings.get_provider_models("openai")
         
+        # 能力 -> 模型列表，模型配置在进程内不变，只在初始化时建一次索引
+        self._models_by_capability: Dict[str, List[str]] = {}
+        for model_name, model_info in self.available_models.items():
+            for capability in model_info.get("capabilities", []):
+                self._models_by_capability.setdefault(capability, []).append(model_name)
+        
+        # 模型 -> 模型类型
+        self._model_types: Dict[str, Optional[str]] = {
+            model_name: model_info.get("model_type")
+            for model_name, model_info in self.available_models.items()
+            if model_info
+        }
+        
+        # 支持图像输入（图像分析或多模态）的模型
+        self._image_input_models = frozenset(
+            self._models_by_capability.get("image_analysis", []) + self._models_by_capability.get("multimodal", [])
+        )
+        
         self.logger.info("OpenAI服务初始化完成", extra={
             "has_api_key": bool(self.api_key),
             "timeout": self.timeout,
@@ -51,11 +133,7 @@ class OpenAIService(BaseService):
     
     def _get_models_by_capability(self, capability: str) -> List[str]:
         """根据能力获取模型列表"""
-        models = []
-        for model_name, model_info in self.available_models.items():
-            if capability in model_info.get("capabilities", []):
-                models.append(model_name)
-        return models
+        return list(self._models_by_capability.get(capability, ()))
     
     def validate_model(self, model: str) -> bool:
         """验证模型是否可用"""
@@ -67,23 +145,17 @@ class OpenAIService(BaseService):
     
     def get_model_type(self, model: str) -> Optional[str]:
         """获取模型类型"""
-        model_info = self.get_model_info(model)
-        if model_info:
-            return model_info.get("model_type")
-        return None
+        return self._model_types.get(model)
     
     def _supports_image_input(self, model: str) -> bool:
         """检查模型是否支持图像输入"""
-        model_info = self.get_model_info(model)
-        if not model_info:
-            return False
-        
-        capabilities = model_info.get("capabilities", [])
-        return any(cap in capabilities for cap in ["image_analysis", "multimodal"])
+        return model in self._image_input_models
     
-    def _process_image_inputs(self, input_data: Dict[str, Any], model: str) -> List[Dict[str, Any]]:
+    def _process_image_inputs(self, input_data: Dict[str, Any], model: str,
+                              supports_image_input: Optional[bool] = None) -> List[Dict[str, Any]]:
         """
         处理图像输入，统一转换为内容数组格式
+        supports_image_input: 调用方已查询过时直接传入，避免重复查询
         返回: 处理后的内容数组，第一个是文本，后续是图像
         """
         content_parts = []
@@ -94,7 +166,9 @@ class OpenAIService(BaseService):
             content_parts.append({"type": "text", "text": text_content})
         
         # 检查模型是否支持图像输入
-        if not self._supports_image_input(model):
+        if supports_image_input is None:
+            supports_image_input = self._supports_image_input(model)
+        if not supports_image_input:
             self.logger.info(f"模型 {model} 不支持图像输入，忽略图像数据")
             return content_parts
         
@@ -130,7 +204,7 @@ class OpenAIService(BaseService):
         elif "image_data" in input_data:
             image_data = input_data["image_data"]
             if isinstance(image_data, bytes):
-                image_base64 = base64.b64encode(image_data).decode('utf-8')
+                image_base64 = _b64encode(image_data).decode('ascii')
             else:
                 image_base64 = str(image_data)
             
@@ -144,35 +218,30 @@ class OpenAIService(BaseService):
         
         return content_parts
     
-    def _build_final_prompt(self, input_data: Dict[str, Any]) -> str:
+    def _build_final_prompt(self, input_data: Dict[str, Any], model: str,
+                            supports_image_input: Optional[bool] = None) -> str:
         """构建最终提示词（用于不支持多模态的场景）"""
         base_prompt = input_data.get("prompt", "")
         
         # 添加参考信息
-        reference_parts = []
-        
-        if "reference_image_description" in input_data:
-            reference_parts.append(f"Reference style: {input_data['reference_image_description']}")
-        
-        if "style_guidance" in input_data:
-            reference_parts.append(f"Style guidance: {input_data['style_guidance']}")
-        
-        if "reference_prompt" in input_data:
-            reference_parts.append(f"Reference asset: {input_data['reference_prompt']}")
+        reference_parts = [
+            template.format(input_data[key])
+            for key, template in _REFERENCE_PROMPT_TEMPLATES
+            if key in input_data
+        ]
         
         # 如果有参考图像但模型不支持，添加描述性文本
-        if not self._supports_image_input("dummy"):  # 这里的模型检查在调用处进行
+        if supports_image_input is None:
+            supports_image_input = self._supports_image_input(model)
+        if not supports_image_input:
             if "image_urls" in input_data or "image_url" in input_data:
                 reference_parts.append("Note: Reference images provided but not directly processable")
         
-        # 构建最终提示词
-        if reference_parts:
-            reference_text = "\n\n".join(reference_parts)
-            final_prompt = f"{base_prompt}\n\n{reference_text}"
-        else:
-            final_prompt = base_prompt
+        # 常见情况没有参考信息，直接返回原提示词
+        if not reference_parts:
+            return base_prompt
         
-        return final_prompt
+        return f"{base_prompt}\n\n" + "\n\n".join(reference_parts)
     
     def _prepare_request_headers(self) -> Dict[str, str]:
         """准备请求头"""
@@ -181,24 +250,109 @@ class OpenAIService(BaseService):
             "Content-Type": "application/json"
         }
     
-    def _make_http_request(self, method: str, url: str, headers: Dict[str, str], 
-                          data: Dict[str, Any]) -> requests.Response:
+    async def _make_http_request(self, method: str, url: str, headers: Dict[str, str], 
+                                 data: Dict[str, Any]) -> httpx.Response:
         """发起HTTP请求"""
-        import json
-        # TODO change to DEBUG later
-        self.logger.info(f"HTTP {method.upper()} Request to {url}")
-        self.logger.info(f"Headers: {headers}")
-        self.logger.info(f"Data: {data}")
-        
-        if method.upper() == "POST":
-            response = requests.post(url, headers=headers, data=json.dumps(data), timeout=self.timeout)
-        else:
-            response = requests.get(url, headers=headers, timeout=self.timeout)
+        # 请求体可能包含大段base64图片，只在DEBUG级别格式化输出；认证头不写入日志
+        if self.logger.isEnabledFor(logging.DEBUG):
+            self.logger.debug("HTTP %s Request to %s", method.upper(), url)
+            self.logger.debug("Headers: %s", {
+                key: ("<redacted>" if key == "Authorization" else value) for key, value in headers.items()
+            })
+            self.logger.debug("Data: %s", data)
+        
+        # 请求体只编码一次，重试时复用；base64图片较大时orjson编码明显更快
+        # Content-Type已在self._headers中设置
+        body = orjson.dumps(data) if orjson is not None and method.upper() == "POST" else None
         
-        response.raise_for_status()
-        return response
+        for attempt in range(self.max_retries + 1):
+            try:
+                if body is not None:
+                    response = await self._http.post(url, headers=headers, content=body)
+                elif method.upper() == "POST":
+                    response = await self._http.post(url, headers=headers, json=data)
+                else:
+                    response = await self._http.get(url, headers=headers)
+            except httpx.TransportError as e:
+                if attempt == self.max_retries:
+                    raise
+                retry_delay = self._get_retry_delay(attempt, None)
+                self.logger.warning(f"OpenAI请求连接失败，{retry_delay:.1f}s后重试: {str(e)}")
+            else:
+                if response.status_code not in _RETRYABLE_STATUS or attempt == self.max_retries:
+                    response.raise_for_status()
+                    return response
+                retry_delay = self._get_retry_delay(attempt, response)
+                self.logger.warning(f"OpenAI请求返回{response.status_code}，{retry_delay:.1f}s后重试")
+            
+            await asyncio.sleep(retry_delay)
+    
+    @staticmethod
+    def _parse_json(response: httpx.Response) -> Dict[str, Any]:
+        """解析响应JSON - 安装了orjson时用其解码"""
+        if orjson is None:
+            return response.json()
+        return orjson.loads(response.content)
+    
+    def _get_retry_delay(self, attempt: int, response: Optional[httpx.Response]) -> float:
+        """计算重试间隔：优先使用服务端的Retry-After，否则指数退避"""
+        if response is not None:
+            retry_after = response.headers.get("Retry-After")
+            try:
+                return min(float(retry_after), _RETRY_AFTER_MAX_DELAY)
+            except (TypeError, ValueError):
+                pass
+        return min(_RETRY_INITIAL_DELAY * (2 ** attempt), _RETRY_MAX_DELAY)
+    
+    @property
+    def _http(self) -> httpx.AsyncClient:
+        """当前事件循环的HTTP客户端
+        
+        服务实例由工厂缓存，可能跨事件循环使用（如同步包装中的asyncio.run）；
+        每个循环使用自己的客户端，切换循环时不会丢弃其他循环仍在使用的连接池。
+        与原先的requests一致，下载图像时跟随重定向
+        """
+        loop = asyncio.get_running_loop()
+        client = self._http_clients.get(loop)
+        if client is None:
+            client = self._http_clients[loop] = httpx.AsyncClient(
+                timeout=self.timeout,
+                limits=httpx.Limits(max_connections=1000, max_keepalive_connections=200),
+                follow_redirects=True
+            )
+        return client
+    
+    async def aclose(self) -> None:
+        """关闭HTTP连接池
+        
+        当前循环的客户端直接关闭；其他线程中仍在运行的循环，把关闭调度到该循环上执行；
+        已结束的循环无法再关闭连接，只丢弃引用
+        """
+        current_loop = asyncio.get_running_loop()
+        clients = list(self._http_clients.items())
+        self._http_clients.clear()
+        for loop, client in clients:
+            if loop is current_loop:
+                await client.aclose()
+            elif loop.is_running():
+                asyncio.run_coroutine_threadsafe(client.aclose(), loop)
     
     async def run_inference(self, model: str, input_data: Dict[str, Any]) -> str:
+        """运行推理 - input_data中_cache=True时相同请求复用已有结果
+        
+        需要多个不同结果时不要对每次调用启用缓存，否则各次调用会拿到同一个结果
+        """
+        if _CACHE_OPTION_KEY in input_data:
+            # 不修改调用方的字典
+            input_data = dict(input_data)
+            if input_data.pop(_CACHE_OPTION_KEY):
+                cache_key = CachedRunner.make_key(model, input_data)
+                return await self._inference_cache.run(
+                    cache_key, lambda: self._run_inference(model, input_data)
+                )
+        return await self._run_inference(model, input_data)
+    
+    async def _run_inference(self, model: str, input_data: Dict[str, Any]) -> str:
         """运行推理"""
         # 验证模型
         if not self.validate_model(model):
@@ -228,11 +382,14 @@ class OpenAIService(BaseService):
     async def _run_image_inference(self, model: str, input_data: Dict[str, Any]) -> str:
         """运行图像生成推理"""
         url = f"{self.api_host}/images/generations"
-        headers = self._prepare_request_headers()
+        headers = self._headers
+        
+        # 模型信息和图像输入支持在本次请求内只查询一次
+        model_info = self.get_model_info(model)
+        supports_image_input = self._supports_image_input(model)
         
         # 处理图像输入 - 检查是否为支持参考图像的模型
         has_reference_images = any(key in input_data for key in ["image_urls", "image_url", "image_data"])
-        supports_image_input = self._supports_image_input(model)
         
         if has_reference_images and not supports_image_input:
             self.logger.warning(f"模型 {model} 不支持参考图像输入，将忽略图像数据")
@@ -241,7 +398,7 @@ class OpenAIService(BaseService):
                 input_data["reference_image_description"] = "Reference images provided but not supported by this model"
         
         # 构建最终提示词
-        final_prompt = self._build_final_prompt(input_data)
+        final_prompt = self._build_final_prompt(input_data, model, supports_image_input)
         
         # 基础参数
         payload = {
@@ -251,7 +408,6 @@ class OpenAIService(BaseService):
         }
         
         # 根据模型配置设置参数
-        model_info = self.get_model_info(model)
         supported_sizes = model_info.get("supported_sizes", ["1024x1024"])
         requested_size = input_data.get("size", "1024x1024")
         
@@ -289,13 +445,9 @@ class OpenAIService(BaseService):
         })
         
         # 执行请求
-        loop = asyncio.get_event_loop()
-        response = await loop.run_in_executor(
-            None, 
-            lambda: self._make_http_request("POST", url, headers, payload)
-        )
+        response = await self._make_http_request("POST", url, headers, payload)
         
-        response_json = response.json()
+        response_json = self._parse_json(response)
         
         # 处理响应
         if response_json.get("data") and len(response_json["data"]) > 0:
@@ -313,18 +465,19 @@ class OpenAIService(BaseService):
             error_detail = response_json.get("error", {}).get("message", str(response_json))
             raise Exception(f"图像生成失败: {error_detail}")
     
-    async def _run_text_inference(self, model: str, input_data: Dict[str, Any]) -> str:
-        """运行文本生成推理"""
-        url = f"{self.api_host}/chat/completions"
-        headers = self._prepare_request_headers()
-        
+    def _build_text_payload(self, model: str, input_data: Dict[str, Any]) -> Tuple[Dict[str, Any], int]:
+        """构建文本生成请求体，返回(payload, 图片数量)"""
         # 构建消息
         messages = []
         if "system_prompt" in input_data:
             messages.append({"role": "system", "content": input_data["system_prompt"]})
         
+        # 模型信息和图像输入支持在本次请求内只查询一次
+        model_info = self.get_model_info(model)
+        supports_image_input = self._supports_image_input(model)
+        
         # 处理图像输入
-        content_parts = self._process_image_inputs(input_data, model)
+        content_parts = self._process_image_inputs(input_data, model, supports_image_input)
         
         # 如果有图片内容，使用多模态消息
         if len(content_parts) > 1:
@@ -334,11 +487,10 @@ class OpenAIService(BaseService):
             })
         else:
             # 纯文本消息
-            final_prompt = self._build_final_prompt(input_data)
+            final_prompt = self._build_final_prompt(input_data, model, supports_image_input)
             messages.append({"role": "user", "content": final_prompt})
         
         # 获取模型限制
-        model_info = self.get_model_info(model)
         max_tokens = model_info.get("max_tokens", 4096) if model_info else 4096
         requested_tokens = input_data.get("max_tokens", 500)
         actual_max_tokens = min(max_tokens, requested_tokens)
@@ -353,7 +505,7 @@ class OpenAIService(BaseService):
         # 添加 response_format 支持
         if "response_format" in input_data:
             # 只有特定模型支持 JSON 模式
-            if model in ["gpt-4o", "gpt-4-turbo", "gpt-3.5-turbo"] and input_data["response_format"].get("type") == "json_object":
+            if model in _JSON_MODE_MODELS and input_data["response_format"].get("type") == "json_object":
                 payload["response_format"] = input_data["response_format"]
                 self.logger.info(f"启用JSON响应模式: {model}")
             else:
@@ -362,52 +514,136 @@ class OpenAIService(BaseService):
         # 计算图片数量用于日志
         image_count = max(0, len(content_parts) - 1)  # 减去文本部分
         
+        return payload, image_count
+    
+    def _extract_text_contents(self, response_json: Dict[str, Any], count: int) -> List[str]:
+        """按choice的index顺序取出前count个文本结果，缺失或为空时抛出异常"""
+        choices = sorted(response_json.get("choices") or [], key=lambda choice: choice.get("index", 0))
+        contents = [choice.get("message", {}).get("content", "") for choice in choices[:count]]
+        
+        if len(contents) < count or not all(contents):
+            # 错误处理
+            error_detail = response_json.get("error", {}).get("message", str(response_json))
+            raise Exception(f"文本生成失败: {error_detail}")
+        
+        return [content.strip() for content in contents]
+    
+    async def _run_text_inference(self, model: str, input_data: Dict[str, Any]) -> str:
+        """运行文本生成推理"""
+        url = f"{self.api_host}/chat/completions"
+        headers = self._headers
+        
+        payload, image_count = self._build_text_payload(model, input_data)
+        
         self.logger.info(f"调用文本生成API", extra={
             "model": model,
-            "message_count": len(messages),
+            "message_count": len(payload["messages"]),
             "image_count": image_count,
             "has_images": image_count > 0,
-            "max_tokens": actual_max_tokens,
+            "max_tokens": payload["max_tokens"],
             "response_format": input_data.get("response_format", {}).get("type", "text")
         })
         
-        # 执行请求
-        loop = asyncio.get_event_loop()
-        response = await loop.run_in_executor(
-            None, 
-            lambda: self._make_http_request("POST", url, headers, payload)
-        )
+        # 开启合并窗口时交给批处理，由窗口结束时统一发出请求
+        if self.batch_window > 0:
+            content, usage = await self._enqueue_text_request(payload)
+        else:
+            # 执行请求
+            response = await self._make_http_request("POST", url, headers, payload)
+            
+            response_json = self._parse_json(response)
+            
+            # 处理响应
+            content = self._extract_text_contents(response_json, 1)[0]
+            usage = response_json.get("usage", {})
         
-        response_json = response.json()
+        self.logger.info(f"文本生成成功: {model}", extra={
+            "response_length": len(content),
+            "image_count": image_count,
+            "usage": usage
+        })
+        return content
+    
+    async def _request_text_group(self, payload: Dict[str, Any], count: int) -> Tuple[List[str], Dict[str, Any]]:
+        """对同一请求体发出一次调用，返回(count个候选（按choice的index排序）, 本次调用的usage)"""
+        if count > 1:
+            payload = {**payload, "n": count}
+        response = await self._make_http_request("POST", f"{self.api_host}/chat/completions", self._headers, payload)
+        response_json = self._parse_json(response)
+        return self._extract_text_contents(response_json, count), response_json.get("usage", {})
+    
+    async def _enqueue_text_request(self, payload: Dict[str, Any]) -> Tuple[str, Dict[str, Any]]:
+        """把文本请求放入当前合并窗口，等待窗口结束后的(结果, 所在合并请求的usage)"""
+        loop = asyncio.get_running_loop()
+        if self._text_flush_loop is not loop:
+            # 服务实例由工厂缓存，可能跨事件循环使用（如同步包装中的asyncio.run）；
+            # 旧循环已结束时其定时器不会再触发，丢弃旧窗口的状态，避免新请求永远等不到分发
+            if self._text_flush_handle is not None:
+                self._text_flush_handle.cancel()
+            self._text_flush_handle = None
+            self._pending_text_groups = {}
+            self._text_flush_loop = loop
+        future = loop.create_future()
+        
+        group_key = json.dumps(payload, sort_keys=True, ensure_ascii=False)
+        group = self._pending_text_groups.get(group_key)
+        if group is None:
+            self._pending_text_groups[group_key] = (payload, [future])
+        else:
+            group[1].append(future)
         
-        # 处理响应
-        if "choices" in response_json and response_json["choices"]:
-            content = response_json["choices"][0].get("message", {}).get("content", "")
-            if content:
-                self.logger.info(f"文本生成成功: {model}", extra={
-                    "response_length": len(content),
-                    "image_count": image_count,
-                    "usage": response_json.get("usage", {})
-                })
-                return content.strip()
+        # 窗口内第一个请求负责定时，窗口结束时一次性分发
+        if self._text_flush_handle is None:
+            self._text_flush_handle = loop.call_later(self.batch_window, self._flush_text_batch)
         
-        # 错误处理
-        error_detail = response_json.get("error", {}).get("message", str(response_json))
-        raise Exception(f"文本生成失败: {error_detail}")
+        return await future
+    
+    def _flush_text_batch(self) -> None:
+        """合并窗口结束：每组（超过max_batch_size时拆分）发出一次请求"""
+        groups, self._pending_text_groups = self._pending_text_groups, {}
+        self._text_flush_handle = None
+        
+        for payload, futures in groups.values():
+            for start in range(0, len(futures), self.max_batch_size):
+                task = asyncio.ensure_future(
+                    self._dispatch_text_group(payload, futures[start:start + self.max_batch_size])
+                )
+                # 保留任务引用，避免执行中被回收
+                self._text_batch_tasks.add(task)
+                task.add_done_callback(self._text_batch_tasks.discard)
+    
+    async def _dispatch_text_group(self, payload: Dict[str, Any], futures: List[asyncio.Future]) -> None:
+        """执行一组合并请求并把结果或异常分发给各调用方，组与组之间互不影响"""
+        try:
+            contents, usage = await self._request_text_group(payload, len(futures))
+        except Exception as e:
+            for future in futures:
+                if not future.done():
+                    future.set_exception(e)
+        else:
+            for future, content in zip(futures, contents):
+                if not future.done():
+                    future.set_result((content, usage))
     
     async def _download_image_as_base64(self, image_url: str) -> str:
         """下载图像并转换为base64"""
         self.logger.info(f"下载图像: {image_url}")
         
-        loop = asyncio.get_event_loop()
         try:
-            response = await loop.run_in_executor(
-                None,
-                lambda: requests.get(image_url, timeout=60)
-            )
-            response.raise_for_status()
+            # 边下载边编码：每次编码3字节对齐的部分，剩余字节留到下一块，不保留完整的原始图像
+            encoded = bytearray()
+            carry = b""
+            async with self._http.stream("GET", image_url, timeout=60) as response:
+                response.raise_for_status()
+                async for chunk in response.aiter_bytes(_DOWNLOAD_CHUNK_SIZE):
+                    if carry:
+                        chunk = carry + chunk
+                    aligned_size = len(chunk) - len(chunk) % 3
+                    encoded += _b64encode(chunk[:aligned_size])
+                    carry = chunk[aligned_size:]
+            encoded += _b64encode(carry)
             
-            base64_str = base64.b64encode(response.content).decode('utf-8')
+            base64_str = encoded.decode('ascii')
             self.logger.info("图像下载转换完成")
             return base64_str
             
@@ -419,14 +655,8 @@ class OpenAIService(BaseService):
         """健康检查"""
         try:
             # 检查API连通性
-            headers = self._prepare_request_headers()
-            
             try:
-                loop = asyncio.get_event_loop()
-                response = await loop.run_in_executor(
-                    None,
-                    lambda: requests.get(f"{self.api_host}/models", headers=headers, timeout=10)
-                )
+                response = await self._http.get(f"{self.api_host}/models", headers=self._headers, timeout=10)
                 api_accessible = response.status_code == 200
             except:
                 api_accessible = False
@@ -456,5 +686,4 @@ class OpenAIService(BaseService):
     
     def _get_current_time(self) -> str:
         """获取当前时间字符串"""
-        from datetime import datetime
-        return datetime.utcnow().isoformat()
\ No newline at end of file
+        return datetime.now(timezone.utc).isoformat()
\ No newline at end of file
@@ -1,10 +1,28 @@
 # src/application/services/external/replicate_service.py (更新版)
 import asyncio
-import base64
+from datetime import datetime, timezone
+
+import httpx
 import replicate
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Tuple, Union
 from src.application.services.service_interface import BaseService
 from src.application.config.ai.ai_settings import get_ai_settings
+from src.infrastructure.cache.cached_runner import CachedRunner
+
+try:
+    # pybase64使用SIMD实现，大块数据编码明显更快；未安装时使用标准库
+    from pybase64 import b64encode as _b64encode
+except ImportError:
+    from base64 import b64encode as _b64encode
+
+# input_data中控制是否使用推理结果缓存的键，不会发送给模型
+_CACHE_OPTION_KEY = "_cache"
+
+# input_data中指定文件输出返回格式的键，不会发送给模型；值为"url"时直接返回文件URL
+_RETURN_FORMAT_KEY = "_return_format"
+
+# 只在服务内部使用、不发送给模型的控制键
+_CONTROL_KEYS = frozenset({_CACHE_OPTION_KEY, _RETURN_FORMAT_KEY})
 
 
 class ReplicateService(BaseService):
@@ -25,11 +43,45 @@ class ReplicateService(BaseService):
         self.timeout = replicate_config.get("timeout", 300)
         self.max_retries = replicate_config.get("max_retries", 3)
         
+        # SDK调用是阻塞的，放到线程中执行；信号量限制同时占用的线程和进行中的预测数
+        self.max_concurrent = replicate_config.get("max_concurrent", 32)
+        # 信号量绑定首次使用它的事件循环，因此按当前循环创建（见_inference_semaphore）
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._semaphore_loop: Optional[asyncio.AbstractEventLoop] = None
+        
+        # 相同模型+输入的推理结果缓存，需在input_data中传入_cache=True启用
+        self._inference_cache = CachedRunner(replicate_config.get("inference_cache_size", 1024))
+        
         # 从AI配置获取支持的模型
         self.available_models = self.ai_settings.get_provider_models("replicate")
         
-        # 初始化客户端
-        self.client = replicate.Client(api_token=self.api_key)
+        # 能力 -> 模型列表，模型配置在进程内不变，只在初始化时建一次索引
+        self._models_by_capability: Dict[str, List[str]] = {}
+        for model_name, model_info in self.available_models.items():
+            for capability in model_info.get("capabilities", []):
+                self._models_by_capability.setdefault(capability, []).append(model_name)
+        
+        # 模型 -> 模型类型
+        self._model_types: Dict[str, Optional[str]] = {
+            model_name: model_info.get("model_type")
+            for model_name, model_info in self.available_models.items()
+            if model_info
+        }
+        
+        # 模型 -> (原生输出数量参数名, 单次调用的输出上限)，取自模型配置的native_batch_param/native_batch_max；
+        # 两项都配置的模型批量推理时按上限分批，每批只需一次调用
+        self._native_batch_params: Dict[str, Tuple[str, int]] = {
+            model_name: (model_info["native_batch_param"], int(model_info["native_batch_max"]))
+            for model_name, model_info in self.available_models.items()
+            if model_info and model_info.get("native_batch_param") and model_info.get("native_batch_max")
+        }
+        
+        # 初始化客户端 - SDK的同步HTTP客户端使用服务持有的连接池，服务实例由工厂缓存，
+        # 连接在进程内复用，应用关闭时由工厂调用aclose()释放
+        self._transport = httpx.HTTPTransport(
+            limits=httpx.Limits(max_connections=self.max_concurrent, max_keepalive_connections=self.max_concurrent)
+        )
+        self.client = replicate.Client(api_token=self.api_key, transport=self._transport)
         
         self.logger.info("Replicate服务初始化完成", extra={
             "api_host": self.api_host,
@@ -39,6 +91,19 @@ class ReplicateService(BaseService):
             "available_models": list(self.available_models.keys())
         })
     
+    @property
+    def _inference_semaphore(self) -> asyncio.Semaphore:
+        """当前事件循环的并发信号量
+        
+        服务实例由工厂缓存，可能跨事件循环使用（如同步包装中的asyncio.run）；
+        循环变化时为新循环重建信号量，旧循环中进行中的请求随旧循环结束
+        """
+        loop = asyncio.get_running_loop()
+        if self._semaphore is None or self._semaphore_loop is not loop:
+            self._semaphore = asyncio.Semaphore(self.max_concurrent)
+            self._semaphore_loop = loop
+        return self._semaphore
+    
     def get_service_info(self) -> Dict[str, Any]:
         return {
             "service_name": self.service_name,
@@ -57,11 +122,7 @@ class ReplicateService(BaseService):
     
     def _get_models_by_capability(self, capability: str) -> List[str]:
         """根据能力获取模型列表"""
-        models = []
-        for model_name, model_info in self.available_models.items():
-            if capability in model_info.get("capabilities", []):
-                models.append(model_name)
-        return models
+        return list(self._models_by_capability.get(capability, ()))
     
     def validate_model(self, model: str) -> bool:
         """验证模型是否可用"""
@@ -73,10 +134,7 @@ class ReplicateService(BaseService):
     
     def get_model_type(self, model: str) -> Optional[str]:
         """获取模型类型"""
-        model_info = self.get_model_info(model)
-        if model_info:
-            return model_info.get("model_type")
-        return None
+        return self._model_types.get(model)
     
     async def run_inference(self, model: str, input_data: Dict[str, Any]) -> str:
         """
@@ -84,13 +142,31 @@ class ReplicateService(BaseService):
         
         Args:
             model: 模型名称 (如: ardianfe/musicgen-stereo-chord:latest)
-            input_data: 输入数据
+            input_data: 输入数据，_cache=True时相同请求复用已有结果（需要多个不同结果时用batch_inference）；
+                _return_format="url"时文件输出直接返回Replicate的文件URL，否则返回base64
         """
+        if _CACHE_OPTION_KEY in input_data:
+            # 不修改调用方的字典
+            input_data = dict(input_data)
+            if input_data.pop(_CACHE_OPTION_KEY):
+                cache_key = CachedRunner.make_key(model, input_data)
+                return await self._inference_cache.run(
+                    cache_key, lambda: self._run_inference(model, input_data)
+                )
+        return await self._run_inference(model, input_data)
+    
+    async def _run_inference(self, model: str, input_data: Dict[str, Any]) -> str:
+        """运行单次推理（不经过缓存）"""
         # 验证模型
         if not self.validate_model(model):
             available_models = list(self.available_models.keys())
             raise ValueError(f"不支持的模型: {model}. 可用模型: {available_models}")
         
+        # 调用方能直接使用URL时，文件输出不再下载和编码
+        return_url = input_data.get(_RETURN_FORMAT_KEY) == "url"
+        if _RETURN_FORMAT_KEY in input_data:
+            input_data = {key: value for key, value in input_data.items() if key != _RETURN_FORMAT_KEY}
+        
         try:
             self.logger.info(f"运行Replicate推理: {model}", extra={
                 "model": model,
@@ -98,41 +174,76 @@ class ReplicateService(BaseService):
                 "input_keys": list(input_data.keys()) if input_data else []
             })
             
-            # 直接传递模型名称字符串
-            output = self.client.run(model, input=input_data)
+            # 直接传递模型名称字符串；调用和读取输出都在线程中完成，不阻塞事件循环
+            async with self._inference_semaphore:
+                output = await asyncio.to_thread(self._run_and_collect, model, input_data, return_url)
             
             # 处理不同类型的输出
-            if isinstance(output, replicate.helpers.FileOutput):
+            if isinstance(output, str):
+                # 文件输出的URL，直接返回
+                self.logger.debug(f"文件输出返回URL: {output}")
+                return output
+            elif isinstance(output, bytes):
                 # 文件输出转换为base64
-                content_bytes = output.read()
-                base64_str = base64.b64encode(content_bytes).decode('utf-8')
+                content_bytes = output
+                base64_str = _b64encode(content_bytes).decode('ascii')
                 self.logger.debug(f"文件输出转换为base64: {len(base64_str)}字符")
                 return base64_str
             else:
                 # 列表输出取最后一个结果
-                results = list(output)
+                results = output
                 if not results:
                     raise ValueError("Replicate返回空结果")
                 
                 final_result = results[-1]
                 self.logger.debug(f"列表输出取最后结果: {type(final_result).__name__}")
+                # 列表中的文件输出已读取为字节，与单个文件输出一样转换为base64
+                if isinstance(final_result, bytes):
+                    return _b64encode(final_result).decode('ascii')
                 return final_result
                 
         except Exception as e:
             self.logger.error(f"Replicate推理失败: {str(e)}", extra={
                 "model": model,
-                "input_data": input_data,
+                # 输入可能包含大段base64数据，只记录键和长度
+                "input_keys": list(input_data.keys()) if input_data else [],
+                "input_sizes": {
+                    key: (len(value) if isinstance(value, (str, bytes, list)) else None)
+                    for key, value in input_data.items()
+                } if input_data else {},
                 "error_type": type(e).__name__
             })
             raise
     
+    @staticmethod
+    def _collect_item(item: Any, return_url: bool) -> Any:
+        """文件输出读取为字节（return_url时返回URL），其他输出原样返回"""
+        if isinstance(item, replicate.helpers.FileOutput):
+            return item.url if return_url else item.read()
+        return item
+    
+    def _run_and_collect(self, model: str, input_data: Dict[str, Any],
+                         return_url: bool = False) -> Union[str, bytes, List[Any]]:
+        """同步执行推理并读取输出 - 单个文件输出返回字节（return_url时返回URL），其他输出展开为列表"""
+        output = self.client.run(model, input=input_data)
+        if isinstance(output, replicate.helpers.FileOutput):
+            return self._collect_item(output, return_url)
+        return [self._collect_item(item, return_url) for item in output]
+    
+    def _run_and_collect_all(self, model: str, input_data: Dict[str, Any],
+                             return_url: bool = False) -> List[Any]:
+        """同步执行推理并读取全部输出 - 文件输出读取为字节（return_url时返回URL）"""
+        output = self.client.run(model, input=input_data)
+        items = [output] if isinstance(output, replicate.helpers.FileOutput) else output
+        return [self._collect_item(item, return_url) for item in items]
+    
     async def batch_inference(self, model: str, input_data: Dict[str, Any], num_outputs: int) -> List[str]:
         """
         批量推理
         
         Args:
             model: 模型名称
-            input_data: 输入数据
+            input_data: 输入数据，_cache=True时相同输入和输出数量的请求复用整批结果
             num_outputs: 输出数量
         """
         # 验证模型
@@ -140,28 +251,28 @@ class ReplicateService(BaseService):
             available_models = list(self.available_models.keys())
             raise ValueError(f"不支持的模型: {model}. 可用模型: {available_models}")
         
+        use_cache = False
+        if _CACHE_OPTION_KEY in input_data:
+            # 不修改调用方的字典
+            input_data = dict(input_data)
+            use_cache = bool(input_data.pop(_CACHE_OPTION_KEY))
+        
         try:
             self.logger.info(f"开始批量推理: {model}", extra={
                 "model": model,
                 "num_outputs": num_outputs
             })
             
-            # 创建异步任务列表
-            tasks = [
-                self.run_inference(model, input_data)
-                for _ in range(num_outputs)
-            ]
-            
-            # 并发执行
-            results = await asyncio.gather(*tasks, return_exceptions=True)
-            
-            # 处理结果，过滤异常
-            valid_results = []
-            for i, result in enumerate(results):
-                if isinstance(result, Exception):
-                    self.logger.error(f"批量推理第{i+1}个任务失败: {str(result)}")
-                else:
-                    valid_results.append(result)
+            if use_cache:
+                # 整批结果按输入和输出数量缓存；批内各次调用不经过缓存，每个输出都是独立生成的
+                cache_key = CachedRunner.make_key(model, {"input": input_data, "num_outputs": num_outputs})
+                cached_results = await self._inference_cache.run(
+                    cache_key, lambda: self._run_batch(model, input_data, num_outputs)
+                )
+                # 缓存的列表由多个调用方共享，返回副本
+                valid_results = list(cached_results)
+            else:
+                valid_results = await self._run_batch(model, input_data, num_outputs)
             
             self.logger.info(f"批量推理完成: {len(valid_results)}个结果", extra={
                 "model": model,
@@ -178,6 +289,97 @@ class ReplicateService(BaseService):
             })
             raise
     
+    async def _run_batch(self, model: str, input_data: Dict[str, Any], num_outputs: int) -> List[str]:
+        """执行批量推理（不经过缓存）"""
+        native_batch = self._native_batch_params.get(model)
+        if native_batch is not None and num_outputs > 1:
+            # 模型原生支持输出数量参数，按单次上限分批调用
+            return await self._native_batch_inference(model, input_data, num_outputs, *native_batch)
+        return await self._gather_inference(model, input_data, num_outputs)
+    
+    async def _gather_inference(self, model: str, input_data: Dict[str, Any], num_outputs: int) -> List[str]:
+        """并发执行num_outputs次单次推理，失败的输出只记录日志并跳过"""
+        # 创建异步任务列表
+        tasks = [
+            self.run_inference(model, input_data)
+            for _ in range(num_outputs)
+        ]
+        
+        # 并发执行
+        results = await asyncio.gather(*tasks, return_exceptions=True)
+        
+        # 处理结果，过滤异常
+        valid_results = []
+        for i, result in enumerate(results):
+            if isinstance(result, Exception):
+                self.logger.error(f"批量推理第{i+1}个任务失败: {str(result)}")
+            else:
+                valid_results.append(result)
+        return valid_results
+    
+    async def _native_batch_inference(self, model: str, input_data: Dict[str, Any], num_outputs: int,
+                                      batch_param: str, batch_max: int) -> List[str]:
+        """
+        按模型的单次输出上限分批，每批一次调用生成多个结果
+        
+        失败语义与逐个调用一致：某一批失败只记录日志，不影响其他批；
+        某一批返回的结果少于请求数时，缺少的部分用单次推理补齐
+        
+        Args:
+            model: 模型名称
+            input_data: 输入数据
+            num_outputs: 输出数量
+            batch_param: 模型的输出数量参数名
+            batch_max: 单次调用的输出上限
+        """
+        # 例如 num_outputs=10, batch_max=4 -> [4, 4, 2]
+        batch_sizes = [batch_max] * (num_outputs // batch_max)
+        if num_outputs % batch_max:
+            batch_sizes.append(num_outputs % batch_max)
+        
+        batches = await asyncio.gather(
+            *(self._run_native_batch(model, input_data, size, batch_param) for size in batch_sizes),
+            return_exceptions=True
+        )
+        
+        valid_results = []
+        missing = 0
+        for i, (size, outputs) in enumerate(zip(batch_sizes, batches)):
+            if isinstance(outputs, Exception):
+                self.logger.error(f"批量推理第{i+1}批（{size}个输出）失败: {str(outputs)}")
+                continue
+            valid_results.extend(outputs[:size])
+            missing += max(0, size - len(outputs))
+        
+        if missing:
+            self.logger.warning(f"原生批量推理少返回{missing}个结果，逐个补齐", extra={
+                "model": model,
+                "missing": missing
+            })
+            valid_results.extend(await self._gather_inference(model, input_data, missing))
+        
+        return valid_results
+    
+    async def _run_native_batch(self, model: str, input_data: Dict[str, Any],
+                                size: int, batch_param: str) -> List[str]:
+        """一次调用请求size个结果，文件输出按_return_format返回URL或base64"""
+        return_url = input_data.get(_RETURN_FORMAT_KEY) == "url"
+        model_input = {key: value for key, value in input_data.items() if key not in _CONTROL_KEYS}
+        model_input[batch_param] = size
+        
+        async with self._inference_semaphore:
+            outputs = await asyncio.to_thread(self._run_and_collect_all, model, model_input, return_url)
+        
+        # 文件输出转换为base64，其他输出原样返回
+        return [
+            _b64encode(output).decode('ascii') if isinstance(output, bytes) else output
+            for output in outputs
+        ]
+    
+    async def aclose(self) -> None:
+        """关闭SDK使用的HTTP连接池"""
+        self._transport.close()
+    
     async def health_check(self) -> Dict[str, Any]:
         """健康检查"""
         try:
@@ -206,5 +408,4 @@ class ReplicateService(BaseService):
     
     def _get_current_time(self) -> str:
         """获取当前时间字符串"""
-        from datetime import datetime
-        return datetime.utcnow().isoformat()
\ No newline at end of file
+        return datetime.now(timezone.utc).isoformat()
\ No newline at end of file
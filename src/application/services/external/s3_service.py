@@ -3,7 +3,7 @@ import asyncio
 import time
 from io import BytesIO
 from pathlib import Path
-from typing import Dict, List, Optional, Union, Any
+from typing import BinaryIO, Dict, List, Optional, Union, Any
 from urllib.parse import urlparse
 
 import boto3
@@ -189,7 +189,7 @@ class S3Service:
                 await async_client.put_object(**upload_args)
             else:
                 # 同步客户端的异步包装
-                loop = asyncio.get_event_loop()
+                loop = asyncio.get_running_loop()
                 await loop.run_in_executor(None, self.client.put_object, **upload_args)
             
             file_url = f"https://{self.bucket_name}.s3.{self.region}.amazonaws.com/{key}"
@@ -285,6 +285,49 @@ class S3Service:
             self.logger.error(error_msg, extra={"key": key, "error": str(e)})
             raise Exception(error_msg)
     
+    def upload_fileobj_sync(
+        self,
+        fileobj: BinaryIO,
+        key: str,
+        content_type: Optional[str] = None,
+        metadata: Optional[Dict[str, str]] = None,
+        acl: str = 'private'
+    ) -> Dict[str, str]:
+        """同步流式上传文件对象到S3（boto3 TransferManager自动分块/分片上传）"""
+        try:
+            if not content_type:
+                content_type = self._detect_content_type(key)
+            
+            self.logger.info(f"开始流式上传文件到S3: bucket={self.bucket_name}, key={key}")
+            
+            extra_args = {
+                'ContentType': content_type or 'application/octet-stream',
+                'ACL': acl
+            }
+            
+            if metadata:
+                extra_args['Metadata'] = metadata
+            
+            # 执行上传
+            self.client.upload_fileobj(fileobj, self.bucket_name, key, ExtraArgs=extra_args)
+            
+            file_url = f"https://{self.bucket_name}.s3.{self.region}.amazonaws.com/{key}"
+            
+            self.logger.info(f"文件流式上传成功: {key}", extra={"url": file_url})
+            
+            return {
+                "success": True,
+                "key": key,
+                "url": file_url,
+                "bucket": self.bucket_name,
+                "content_type": content_type
+            }
+            
+        except Exception as e:
+            error_msg = f"S3流式上传失败: {str(e)}"
+            self.logger.error(error_msg, extra={"key": key, "error": str(e)})
+            raise Exception(error_msg)
+    
     async def download_file_async(self, key: str) -> Dict[str, Union[bytes, str]]:
         """异步从S3下载文件"""
         try:
@@ -298,7 +341,7 @@ class S3Service:
                 content = await response['Body'].read()
             else:
                 # 同步客户端的异步包装
-                loop = asyncio.get_event_loop()
+                loop = asyncio.get_running_loop()
                 response = await loop.run_in_executor(
                     None,
                     self.client.get_object,
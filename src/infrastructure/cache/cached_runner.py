@@ -0,0 +1,67 @@
+# src/infrastructure/cache/cached_runner.py
+import asyncio
+import hashlib
+import json
+from collections import OrderedDict
+from functools import partial
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from src.infrastructure.logging.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class CachedRunner:
+    """进程内的异步结果缓存（LRU策略）
+
+    缓存的是执行func的Task而不是结果：相同键的并发调用等待同一个Task，只会执行一次。
+    Task由缓存持有，每个调用方（包括首个）都通过shield等待，某个调用方被取消不影响其他等待方；
+    执行失败或被取消的条目立即移除，不缓存错误。Task绑定创建它的事件循环，循环变化时清空缓存
+    """
+
+    def __init__(self, max_size: int = 1024):
+        self.max_size = max_size
+        self.logger = logger
+        self._cache: "OrderedDict[str, asyncio.Task]" = OrderedDict()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    @staticmethod
+    def make_key(model: str, input_data: Dict[str, Any]) -> str:
+        """按模型和规范化后的输入数据生成缓存键"""
+        raw = json.dumps({"m": model, "i": input_data}, sort_keys=True, default=str)
+        return hashlib.blake2b(raw.encode(), digest_size=16).hexdigest()
+
+    async def run(self, key: str, func: Callable[[], Awaitable[Any]]) -> Any:
+        """命中时等待已有结果，未命中时启动func并缓存"""
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            # 使用者可能跨事件循环复用（如同步包装中的asyncio.run），旧循环的Task不能在新循环中等待
+            self._cache.clear()
+            self._loop = loop
+
+        task = self._cache.get(key)
+        if task is not None:
+            self._cache.move_to_end(key)
+            self.logger.debug(f"缓存命中: {key}")
+        else:
+            task = loop.create_task(func())
+            self._cache[key] = task
+            task.add_done_callback(partial(self._discard_failed, key))
+            while len(self._cache) > self.max_size:
+                self._cache.popitem(last=False)
+
+        # shield: 调用方被取消时只取消自己的等待，共享的Task继续执行
+        return await asyncio.shield(task)
+
+    def _discard_failed(self, key: str, task: asyncio.Task) -> None:
+        """失败或取消的Task不缓存；条目可能已被淘汰或替换，只移除自己"""
+        # exception()同时标记异常已读取，没有等待方时避免"exception was never retrieved"警告
+        if (task.cancelled() or task.exception() is not None) and self._cache.get(key) is task:
+            del self._cache[key]
+
+    def clear(self) -> None:
+        """清空缓存"""
+        self._cache.clear()
+
+    def __len__(self) -> int:
+        return len(self._cache)
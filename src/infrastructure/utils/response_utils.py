@@ -6,9 +6,23 @@ from fastapi.responses import JSONResponse
 
 from src.schemas.dtos.response.base_response import BaseResponse
 
+try:
+    import orjson
+except ImportError:  # orjson为可选依赖，未安装时回退标准库json
+    orjson = None
+
 T = TypeVar('T')
 
 
+class FastJSONResponse(JSONResponse):
+    """JSON响应 - 安装了orjson时用其编码，嵌套较深的大结果（如资产解析结果）序列化更快"""
+    
+    def render(self, content: Any) -> bytes:
+        if orjson is None:
+            return super().render(content)
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
+
+
 class ResponseHelper:
     """响应辅助工具类"""
     
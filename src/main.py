@@ -1,9 +1,10 @@
 # 修改 src/main.py
 import asyncio
+import hashlib
 from contextlib import asynccontextmanager
 from pathlib import Path
 
-from fastapi import FastAPI
+from fastapi import FastAPI, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles  # 新增
 from fastapi.responses import FileResponse   # 新增
@@ -14,6 +15,7 @@ from src.api.routers.main_router import api_router
 from src.application.config.settings import get_settings
 from src.infrastructure.logging.logger import setup_logging, get_logger
 from src.infrastructure.tasks.task_manager import task_manager
+from src.application.services.external.ai_service_factory import ai_service_factory
 
 # 初始化日志
 setup_logging()
@@ -61,6 +63,9 @@ async def lifespan(app: FastAPI):
         # 关闭任务管理器
         await task_manager.shutdown()
         
+        # 关闭AI服务的HTTP连接池
+        await ai_service_factory.aclose()
+        
         # 获取最终统计信息
         storage_stats = task_manager.storage.get_storage_statistics()
         worker_stats = task_manager.worker_pool.get_statistics()
@@ -76,6 +81,19 @@ async def lifespan(app: FastAPI):
         logger.error(f"应用关闭时出错: {str(e)}", exc_info=True)
 
 
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    """按If-None-Match的实体标签列表判断是否命中（弱比较，忽略W/前缀；*匹配任意标签）"""
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*":
+            return True
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == etag:
+            return True
+    return False
+
+
 def create_app() -> FastAPI:
     """创建FastAPI应用实例"""
     settings = get_settings()
@@ -115,15 +133,38 @@ def create_app() -> FastAPI:
     # 挂载静态文件
     app.mount("/static", StaticFiles(directory="static"), name="static")
     
+    # demo页面很少变动，启动时读入内存，请求时不再访问文件系统
+    demo_path = static_dir / "demo.html"
+    if demo_path.is_file():
+        demo_bytes = demo_path.read_bytes()
+        demo_etag = f'"{hashlib.blake2b(demo_bytes, digest_size=8).hexdigest()}"'
+    else:
+        demo_bytes = None
+    
+    def demo_page(request: Request) -> Response:
+        """返回demo页面，支持If-None-Match协商缓存"""
+        if demo_bytes is None:
+            # 启动时文件不存在，按原方式处理
+            return FileResponse("static/demo.html")
+        
+        headers = {
+            "ETag": demo_etag,
+            "Cache-Control": "public, max-age=300"
+        }
+        if _etag_matches(request.headers.get("if-none-match", ""), demo_etag):
+            return Response(status_code=304, headers=headers)
+        
+        return Response(content=demo_bytes, media_type="text/html", headers=headers)
+    
     # 添加根路径重定向到demo页面
     @app.get("/")
-    async def root():
-        return FileResponse("static/demo.html")
+    async def root(request: Request):
+        return demo_page(request)
     
     # 添加demo页面路由
     @app.get("/demo")
-    async def demo():
-        return FileResponse("static/demo.html")
+    async def demo(request: Request):
+        return demo_page(request)
     
     # 健康检查端点
     @app.get("/health")
@@ -140,17 +181,34 @@ def create_app() -> FastAPI:
 app = create_app()
 
 if __name__ == "__main__":
+    import os
+    from importlib.util import find_spec
+    
     import uvicorn
     
     settings = get_settings()
+    reload = settings.reload and settings.is_development
     uvicorn_config = {
         "host": settings.host,
         "port": settings.port,
-        "reload": settings.reload and settings.is_development,
+        "reload": reload,
         "log_config": None,  # 使用自定义日志配置
         "access_log": False,  # 禁用默认访问日志，使用自定义中间件
+        # uvloop/httptools为C实现（uvicorn[standard]自带），未安装时（如Windows）回退纯Python实现
+        "loop": "uvloop" if find_spec("uvloop") else "asyncio",
+        "http": "httptools" if find_spec("httptools") else "h11",
+        # reload模式只能单进程
+        "workers": 1 if reload else int(os.getenv("WEB_CONCURRENCY", "1")),
     }
     
+    # 任务状态默认保存在进程内存中，多个worker之间互不可见；未启用S3任务存储时只能单进程运行
+    task_storage_s3_enabled = settings.task_enable_s3_storage and bool(settings.s3_bucket)
+    if uvicorn_config["workers"] > 1 and not task_storage_s3_enabled:
+        logger.warning("未启用S3任务存储，忽略WEB_CONCURRENCY，以单进程运行", extra={
+            "requested_workers": uvicorn_config["workers"]
+        })
+        uvicorn_config["workers"] = 1
+    
     logger.info("启动服务器", extra=uvicorn_config)
     
-    uvicorn.run("app.main:app", **uvicorn_config)
\ No newline at end of file
+    uvicorn.run("src.main:app", **uvicorn_config)
\ No newline at end of file
@@ -1,6 +1,6 @@
 # src/schemas/dtos/request/art_style_request.py
 from typing import Optional, Dict, Any
-from pydantic import BaseModel, Field, validator
+from pydantic import BaseModel, ConfigDict, Field, field_validator
 from enum import Enum
 
 class ArtStyleMode(str, Enum):
@@ -19,7 +19,8 @@ class ArtStyleComponents(BaseModel):
     lighting: Optional[str] = Field(None, description="光照效果")
     description: Optional[str] = Field(None, description="风格描述说明")
     
-    @validator('base_prompt')
+    @field_validator('base_prompt')
+    @classmethod
     def validate_base_prompt(cls, v):
         if not v or not v.strip():
             raise ValueError('base_prompt不能为空')
@@ -31,30 +32,28 @@ class PresetStyleRequest(BaseModel):
     """预设风格请求 (非AI接口)"""
     preset_theme: str = Field(..., description="预设主题名称")
     
-    class Config:
-        json_schema_extra = {
-            "example": {
-                "preset_theme": "fantasy_medieval"
-            }
+    model_config = ConfigDict(json_schema_extra={
+        "example": {
+            "preset_theme": "fantasy_medieval"
         }
+    })
 
 class CustomDirectStyleRequest(BaseModel):
     """直接自定义风格请求 (非AI接口)"""
     style_components: ArtStyleComponents = Field(..., description="自定义风格组件")
     
-    class Config:
-        json_schema_extra = {
-            "example": {
-                "style_components": {
-                    "base_prompt": "traditional Chinese festive style",
-                    "color_palette": "vibrant red, imperial gold, auspicious crimson",
-                    "effects": "golden glow, lantern light, festive sparkle",
-                    "materials": "silk textures, lacquer finish, jade accents",
-                    "lighting": "warm lantern glow, celebratory brightness",
-                    "description": "Traditional Chinese New Year celebration style"
-                }
+    model_config = ConfigDict(json_schema_extra={
+        "example": {
+            "style_components": {
+                "base_prompt": "traditional Chinese festive style",
+                "color_palette": "vibrant red, imperial gold, auspicious crimson",
+                "effects": "golden glow, lantern light, festive sparkle",
+                "materials": "silk textures, lacquer finish, jade accents",
+                "lighting": "warm lantern glow, celebratory brightness",
+                "description": "Traditional Chinese New Year celebration style"
             }
         }
+    })
 
 class CustomAIEnhancedStyleRequest(BaseModel):
     """AI增强自定义风格请求 (AI接口)"""
@@ -62,7 +61,8 @@ class CustomAIEnhancedStyleRequest(BaseModel):
     provider: str = Field(default="openai", description="AI提供商")
     model: str = Field(default="gpt-4o", description="AI模型")
     
-    @validator('custom_prompt')
+    @field_validator('custom_prompt')
+    @classmethod
     def validate_custom_prompt(cls, v):
         if not v or not v.strip():
             raise ValueError('custom_prompt不能为空')
@@ -70,14 +70,13 @@ class CustomAIEnhancedStyleRequest(BaseModel):
             raise ValueError('custom_prompt长度不能超过500字符')
         return v.strip()
     
-    class Config:
-        json_schema_extra = {
-            "example": {
-                "custom_prompt": "traditional Chinese festive style, vibrant red and gold colors, dragon and phoenix motifs",
-                "provider": "openai",
-                "model": "gpt-4o"
-            }
+    model_config = ConfigDict(json_schema_extra={
+        "example": {
+            "custom_prompt": "traditional Chinese festive style, vibrant red and gold colors, dragon and phoenix motifs",
+            "provider": "openai",
+            "model": "gpt-4o"
         }
+    })
 
 class ReferenceImageStyleRequest(BaseModel):
     """参考图像风格请求 (AI接口) - 用于文件上传时的form参数"""
@@ -85,14 +84,13 @@ class ReferenceImageStyleRequest(BaseModel):
     model: str = Field(default="gpt-4o", description="AI模型 (需要支持图像分析)")
     max_images: int = Field(default=3, ge=1, le=10, description="最大图片数量")
     
-    class Config:
-        json_schema_extra = {
-            "example": {
-                "provider": "openai",
-                "model": "gpt-4o",
-                "max_images": 3
-            }
+    model_config = ConfigDict(json_schema_extra={
+        "example": {
+            "provider": "openai",
+            "model": "gpt-4o",
+            "max_images": 3
         }
+    })
 
 # 保留通用的ArtStyleRequest用于验证接口
 class ArtStyleRequest(BaseModel):
@@ -104,32 +102,31 @@ class ArtStyleRequest(BaseModel):
     provider: Optional[str] = Field("openai", description="AI提供商 (仅AI模式)")
     model: Optional[str] = Field("gpt-4o", description="AI模型 (仅AI模式)")
     
-    class Config:
-        json_schema_extra = {
-            "examples": [
-                {
-                    "mode": "preset",
-                    "preset_theme": "fantasy_medieval"
-                },
-                {
-                    "mode": "custom_direct",
-                    "style_components": {
-                        "base_prompt": "traditional Chinese festive style",
-                        "color_palette": "vibrant red, imperial gold",
-                        "effects": "golden glow, festive sparkle",
-                        "description": "Chinese New Year style"
-                    }
-                },
-                {
-                    "mode": "custom_ai_enhanced", 
-                    "custom_prompt": "traditional Chinese festive style",
-                    "provider": "openai",
-                    "model": "gpt-4o"
-                },
-                {
-                    "mode": "reference_image",
-                    "provider": "openai",
-                    "model": "gpt-4o"
+    model_config = ConfigDict(json_schema_extra={
+        "examples": [
+            {
+                "mode": "preset",
+                "preset_theme": "fantasy_medieval"
+            },
+            {
+                "mode": "custom_direct",
+                "style_components": {
+                    "base_prompt": "traditional Chinese festive style",
+                    "color_palette": "vibrant red, imperial gold",
+                    "effects": "golden glow, festive sparkle",
+                    "description": "Chinese New Year style"
                 }
-            ]
-        }
\ No newline at end of file
+            },
+            {
+                "mode": "custom_ai_enhanced", 
+                "custom_prompt": "traditional Chinese festive style",
+                "provider": "openai",
+                "model": "gpt-4o"
+            },
+            {
+                "mode": "reference_image",
+                "provider": "openai",
+                "model": "gpt-4o"
+            }
+        ]
+    })
\ No newline at end of file
@@ -1,6 +1,6 @@
 # src/schemas/dtos/request/asset_request.py
 from typing import Optional, Dict, Any, Generic, TypeVar
-from pydantic import BaseModel, Field, validator
+from pydantic import BaseModel, Field
 from src.schemas.dtos.request.base_request import BaseRequest
 
 T = TypeVar("T")
@@ -12,9 +12,3 @@ class AssetGenRequest(BaseRequest, Generic[T]):
     model: str = Field(..., description="模型服务类型")
     num_outputs: int = Field(1, ge=1, le=50, description="生成数量")
     generation_params: T = Field(..., description="生成参数")
-    
-    @validator('num_outputs')
-    def validate_num_outputs(cls, v):
-        if v < 1 or v > 50:
-            raise ValueError("输出数量必须在1-50之间")
-        return v
\ No newline at end of file
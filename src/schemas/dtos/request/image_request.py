@@ -1,6 +1,6 @@
 # src/schemas/dtos/request/image_request.py
-from typing import Dict, List, Optional, Any, Union
-from pydantic import BaseModel, Field, field_validator, model_validator
+from typing import Annotated, Dict, List, Optional, Any, Union
+from pydantic import BaseModel, Field, StringConstraints, model_validator
 from enum import Enum
 
 # 导入Art Style相关的DTO
@@ -19,28 +19,15 @@ class ImageGenerationMode(str, Enum):
 
 class ImageAssetItem(BaseModel):
     """统一的图像资产元件格式"""
-    filename: str = Field(..., description="文件名/ID，最简短且唯一")
-    description: str = Field(..., description="描述，用于注入prompt，比单词更有信息量")
+    # 去除首尾空白后校验；文件名只允许字母、数字、下划线和连字符，避免特殊字符
+    filename: Annotated[str, StringConstraints(strip_whitespace=True, min_length=1, pattern=r'^[a-zA-Z0-9_\-]+$')] = Field(
+        ..., description="文件名/ID，最简短且唯一"
+    )
+    description: Annotated[str, StringConstraints(strip_whitespace=True, min_length=1)] = Field(
+        ..., description="描述，用于注入prompt，比单词更有信息量"
+    )
     count: int = Field(default=1, ge=1, le=10, description="生成数量")
     resolution: Optional[str] = Field(None, description="分辨率，可覆盖默认设置", pattern=r'^\d+x\d+$')
-    
-    @field_validator('filename')
-    @classmethod
-    def validate_filename(cls, v):
-        if not v or not v.strip():
-            raise ValueError('filename不能为空')
-        # 简单的文件名验证，避免特殊字符
-        import re
-        if not re.match(r'^[a-zA-Z0-9_\-]+$', v.strip()):
-            raise ValueError('filename只能包含字母、数字、下划线和连字符')
-        return v.strip()
-    
-    @field_validator('description')
-    @classmethod
-    def validate_description(cls, v):
-        if not v or not v.strip():
-            raise ValueError('description不能为空')
-        return v.strip()
 
 # Art Style统一包装器
 class ArtStyleConfig(BaseModel):
@@ -138,6 +125,13 @@ class BackgroundsGenerationInput(BaseModel):
             raise ValueError("至少需要提供background_set或custom_content之一")
         return self
 
+# 模块名 -> 生成参数类型；按模块直接查表，不逐个isinstance判断
+GENERATION_INPUT_CLASSES: Dict[str, type] = {
+    "symbols": SymbolsGenerationInput,
+    "ui": UIGenerationInput,
+    "backgrounds": BackgroundsGenerationInput
+}
+
 # 统一的图像生成请求DTO
 class ImageGenRequest(BaseModel):
     """单模块图像生成请求"""
@@ -154,13 +148,9 @@ class ImageGenRequest(BaseModel):
     @model_validator(mode='after')
     def validate_params_by_module(self):
         """根据模块验证参数类型"""
-        module = self.module
-        if module == 'symbols' and not isinstance(self.generation_params, SymbolsGenerationInput):
-            raise ValueError("symbols模块需要SymbolsGenerationInput类型参数")
-        elif module == 'ui' and not isinstance(self.generation_params, UIGenerationInput):
-            raise ValueError("ui模块需要UIGenerationInput类型参数")
-        elif module == 'backgrounds' and not isinstance(self.generation_params, BackgroundsGenerationInput):
-            raise ValueError("backgrounds模块需要BackgroundsGenerationInput类型参数")
+        expected_type = GENERATION_INPUT_CLASSES.get(self.module)
+        if expected_type is not None and type(self.generation_params) is not expected_type:
+            raise ValueError(f"{self.module}模块需要{expected_type.__name__}类型参数")
         return self
     
     model_config = {
@@ -224,18 +214,12 @@ class CompleteGameGenRequest(BaseModel):
     @model_validator(mode='after')
     def validate_module_configs(self):
         """验证模块配置类型"""
-        valid_modules = {
-            "symbols": SymbolsGenerationInput, 
-            "ui": UIGenerationInput, 
-            "backgrounds": BackgroundsGenerationInput
-        }
-        
         for module_name, config in self.modules.items():
-            if module_name not in valid_modules:
+            expected_type = GENERATION_INPUT_CLASSES.get(module_name)
+            if expected_type is None:
                 raise ValueError(f"不支持的模块: {module_name}")
             
-            expected_type = valid_modules[module_name]
-            if not isinstance(config, expected_type):
+            if type(config) is not expected_type:
                 raise ValueError(f"模块 {module_name} 需要 {expected_type.__name__} 类型配置")
         
         return self
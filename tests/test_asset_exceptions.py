@@ -0,0 +1,43 @@
+# tests/test_asset_exceptions.py
+import pickle
+import pytest
+import sys
+from pathlib import Path
+
+# 确保可以导入src模块
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.application.services.assets.utils.exceptions import (
+    BatchProcessingError,
+    GenerationFailedError,
+    ProviderError,
+    ValidationError
+)
+
+
+class TestAssetExceptionPickling:
+    """测试美术资源异常可以跨进程序列化"""
+
+    @pytest.mark.parametrize("exc", [
+        ProviderError("p", "m"),
+        BatchProcessingError(3, 1, ["e"]),
+        GenerationFailedError("model", "reason", {"step": 1}),
+        ValidationError("field", "message", 42)
+    ])
+    def test_round_trip_keeps_message_and_details(self, exc):
+        """测试pickle往返后消息、错误码和details不变"""
+        restored = pickle.loads(pickle.dumps(exc))
+
+        assert type(restored) is type(exc)
+        assert str(restored) == str(exc)
+        assert restored.error_code == exc.error_code
+        assert restored.details == exc.details
+
+    def test_details_built_on_first_access(self):
+        """测试details在首次读取时构建"""
+        exc = BatchProcessingError(3, 1, ["e"])
+
+        assert exc._details is None
+        assert exc.details["success_count"] == 2
+        assert exc.details["errors"] == ("e",)
@@ -0,0 +1,123 @@
+# tests/test_cached_runner.py
+import asyncio
+import pytest
+import sys
+from pathlib import Path
+
+# 确保可以导入src模块
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.infrastructure.cache.cached_runner import CachedRunner
+
+
+class TestCachedRunner:
+    """测试进程内异步结果缓存"""
+
+    def test_make_key_ignores_dict_order(self):
+        """测试缓存键与输入字典的键顺序无关"""
+        key_a = CachedRunner.make_key("model", {"a": 1, "b": 2})
+        key_b = CachedRunner.make_key("model", {"b": 2, "a": 1})
+
+        assert key_a == key_b
+        assert key_a != CachedRunner.make_key("other_model", {"a": 1, "b": 2})
+
+    @pytest.mark.asyncio
+    async def test_concurrent_calls_share_one_task(self):
+        """测试相同键的并发调用只执行一次"""
+        runner = CachedRunner()
+        calls = 0
+
+        async def compute():
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.05)
+            return "result"
+
+        results = await asyncio.gather(*(runner.run("key", compute) for _ in range(5)))
+
+        assert results == ["result"] * 5
+        assert calls == 1
+
+    @pytest.mark.asyncio
+    async def test_lru_eviction(self):
+        """测试超出容量时淘汰最久未使用的条目"""
+        runner = CachedRunner(max_size=2)
+        calls = []
+
+        def make(key):
+            async def compute():
+                calls.append(key)
+                return key
+            return compute
+
+        await runner.run("a", make("a"))
+        await runner.run("b", make("b"))
+        # 命中a，使b成为最久未使用的条目
+        await runner.run("a", make("a"))
+        await runner.run("c", make("c"))
+
+        assert len(runner) == 2
+        assert calls == ["a", "b", "c"]
+
+        # a仍在缓存中，b已被淘汰需要重新执行
+        await runner.run("a", make("a"))
+        await runner.run("b", make("b"))
+        assert calls == ["a", "b", "c", "b"]
+
+    @pytest.mark.asyncio
+    async def test_failure_is_not_cached(self):
+        """测试执行失败的结果不缓存，所有等待方收到同一异常"""
+        runner = CachedRunner()
+        calls = 0
+
+        async def fail():
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.01)
+            raise ValueError("boom")
+
+        results = await asyncio.gather(*(runner.run("key", fail) for _ in range(3)), return_exceptions=True)
+
+        assert calls == 1
+        assert all(isinstance(result, ValueError) for result in results)
+        assert len(runner) == 0
+
+        with pytest.raises(ValueError):
+            await runner.run("key", fail)
+        assert calls == 2
+
+    @pytest.mark.asyncio
+    async def test_cancelled_caller_does_not_cancel_other_waiters(self):
+        """测试首个调用方被取消时，其他等待方仍拿到结果"""
+        runner = CachedRunner()
+        calls = 0
+
+        async def compute():
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.05)
+            return "result"
+
+        first = asyncio.create_task(runner.run("key", compute))
+        second = asyncio.create_task(runner.run("key", compute))
+        await asyncio.sleep(0.01)
+        first.cancel()
+
+        assert await second == "result"
+        with pytest.raises(asyncio.CancelledError):
+            await first
+        assert calls == 1
+
+    def test_reused_across_event_loops(self):
+        """测试跨事件循环复用时重新执行，而不是等待旧循环的Task"""
+        runner = CachedRunner()
+        calls = 0
+
+        async def compute():
+            nonlocal calls
+            calls += 1
+            return calls
+
+        assert asyncio.run(runner.run("key", compute)) == 1
+        assert asyncio.run(runner.run("key", compute)) == 2
@@ -0,0 +1,192 @@
+# tests/test_image_assets.py
+import asyncio
+import pytest
+import sys
+from pathlib import Path
+
+# 确保可以导入src模块
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from pydantic import ValidationError
+
+from src.application.services.assets.image import base_image_service
+from src.application.services.assets.image.symbols_service import SymbolsService
+from src.schemas.dtos.request.image_request import (
+    GENERATION_INPUT_CLASSES,
+    BackgroundsGenerationInput,
+    CompleteGameGenRequest,
+    ImageAssetItem,
+    ImageGenRequest,
+    SymbolsGenerationInput,
+    UIGenerationInput
+)
+
+
+class FakeAIService:
+    """按调用顺序编号的假推理服务：先发起的调用后完成"""
+
+    def __init__(self, num_outputs: int, failing: tuple = ()):
+        self.num_outputs = num_outputs
+        self.failing = failing
+        self.calls = 0
+
+    async def run_inference(self, model, params):
+        index = self.calls
+        self.calls += 1
+        await asyncio.sleep((self.num_outputs - index) * 0.01)
+        if index in self.failing:
+            raise RuntimeError(f"output {index} failed")
+        return f"output_{index}"
+
+
+class TestImageServiceGenerate:
+    """测试图像服务的并发生成"""
+
+    def setup_method(self):
+        self.service = SymbolsService()
+        self.service.resolve_model_config = lambda model, provider=None: (model, "openai")
+
+    @pytest.mark.asyncio
+    async def test_outputs_keep_request_order(self, monkeypatch):
+        """测试并发生成的结果按请求顺序返回，而不是完成顺序"""
+        fake = FakeAIService(num_outputs=3)
+        monkeypatch.setattr(base_image_service.ai_service_factory, "get_service", lambda provider: fake)
+
+        results = await self.service.generate("gpt_image_1", {"prompt": "test"}, num_outputs=3)
+
+        assert results == ["output_0", "output_1", "output_2"]
+
+    @pytest.mark.asyncio
+    async def test_failed_outputs_are_filtered(self, monkeypatch):
+        """测试单个输出失败时不影响其他输出"""
+        fake = FakeAIService(num_outputs=3, failing=(1,))
+        monkeypatch.setattr(base_image_service.ai_service_factory, "get_service", lambda provider: fake)
+
+        results = await self.service.generate("gpt_image_1", {"prompt": "test"}, num_outputs=3)
+
+        assert results == ["output_0", "output_2"]
+
+
+class TestExpandItems:
+    """测试元件展开为生成任务"""
+
+    def setup_method(self):
+        self.service = SymbolsService()
+
+    def test_expands_items_by_count(self):
+        """测试每个元件按count展开，未指定的字段使用默认值"""
+        items = [
+            {"filename": "dragon", "description": "Red dragon", "count": 2, "resolution": "512x512"},
+            {"filename": "tiger"}
+        ]
+
+        tasks = self.service._expand_items("base_symbols", "high", items, "1024x1024")
+
+        assert [(t["filename"], t["index"], t["resolution"]) for t in tasks] == [
+            ("dragon", 1, "512x512"),
+            ("dragon", 2, "512x512"),
+            ("tiger", 1, "1024x1024")
+        ]
+        assert tasks[2]["description"] == "tiger"
+
+    def test_skips_deprecated_non_dict_items(self):
+        """测试旧格式（非字典）元件被跳过"""
+        items = ["old_style_item", {"filename": "wild", "description": "Wild"}]
+
+        tasks = self.service._expand_items("special_symbols", "wild", items, "1024x1024")
+
+        assert [t["filename"] for t in tasks] == ["wild"]
+
+    def test_keeps_explicit_field_values(self):
+        """测试显式传入的字段不做回退替换，也不因可选字段校验而丢弃"""
+        items = [{"filename": "panel", "description": "", "resolution": None}]
+
+        tasks = self.service._expand_items("custom", "panels", items, "1024x1024")
+
+        assert len(tasks) == 1
+        assert tasks[0]["description"] == ""
+        assert tasks[0]["resolution"] is None
+
+
+class TestImageAssetItem:
+    """测试元件字段的字符串约束"""
+
+    def test_strips_whitespace(self):
+        """测试文件名和描述去除首尾空白"""
+        item = ImageAssetItem(filename="  dragon_1 ", description="  Red dragon  ")
+
+        assert item.filename == "dragon_1"
+        assert item.description == "Red dragon"
+
+    @pytest.mark.parametrize("filename", ["", "   ", "dragon wild", "dragon.png", "../dragon"])
+    def test_rejects_invalid_filename(self, filename):
+        """测试空白和包含特殊字符的文件名被拒绝"""
+        with pytest.raises(ValidationError):
+            ImageAssetItem(filename=filename, description="Dragon")
+
+    def test_rejects_blank_description(self):
+        """测试空白描述被拒绝"""
+        with pytest.raises(ValidationError):
+            ImageAssetItem(filename="dragon", description="   ")
+
+
+class TestGenerationInputDispatch:
+    """测试按模块分派生成参数类型"""
+
+    ART_STYLE = {"mode": "preset", "preset_theme": "fantasy_medieval"}
+    ITEMS = {"main": [{"filename": "item", "description": "Item"}]}
+
+    def test_dispatch_table(self):
+        """测试模块到参数类型的映射"""
+        assert GENERATION_INPUT_CLASSES == {
+            "symbols": SymbolsGenerationInput,
+            "ui": UIGenerationInput,
+            "backgrounds": BackgroundsGenerationInput
+        }
+
+    def test_matching_module_params(self):
+        """测试模块与参数类型一致时通过校验"""
+        request = ImageGenRequest(
+            module="ui",
+            model="gpt_image_1",
+            generation_params={"art_style": self.ART_STYLE, "buttons": self.ITEMS}
+        )
+
+        assert type(request.generation_params) is UIGenerationInput
+
+    def test_mismatched_module_params(self):
+        """测试模块与参数类型不一致时报错"""
+        with pytest.raises(ValidationError, match="SymbolsGenerationInput"):
+            ImageGenRequest(
+                module="symbols",
+                model="gpt_image_1",
+                generation_params={"art_style": self.ART_STYLE, "buttons": self.ITEMS}
+            )
+
+    def test_complete_request_rejects_unknown_module(self):
+        """测试完整游戏请求拒绝未知模块"""
+        with pytest.raises(ValidationError, match="不支持的模块"):
+            CompleteGameGenRequest(
+                global_config={"global_art_style": self.ART_STYLE},
+                modules={"icons": {"art_style": self.ART_STYLE, "buttons": self.ITEMS}}
+            )
+
+    def test_complete_request_checks_each_module(self):
+        """测试完整游戏请求逐个校验模块参数类型"""
+        request = CompleteGameGenRequest(
+            global_config={"global_art_style": self.ART_STYLE},
+            modules={
+                "symbols": {"art_style": self.ART_STYLE, "base_symbols": self.ITEMS},
+                "backgrounds": {"art_style": self.ART_STYLE, "background_set": self.ITEMS}
+            }
+        )
+
+        assert type(request.modules["symbols"]) is SymbolsGenerationInput
+        assert type(request.modules["backgrounds"]) is BackgroundsGenerationInput
+
+        with pytest.raises(ValidationError, match="BackgroundsGenerationInput"):
+            CompleteGameGenRequest(
+                global_config={"global_art_style": self.ART_STYLE},
+                modules={"backgrounds": {"art_style": self.ART_STYLE, "buttons": self.ITEMS}}
+            )
@@ -0,0 +1,74 @@
+# tests/test_openai_http.py
+import asyncio
+import base64
+import httpx
+import pytest
+import sys
+from pathlib import Path
+
+# 确保可以导入src模块
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.application.services.external import openai_service
+from src.application.services.external.openai_service import OpenAIService
+
+
+class FakeAISettings:
+    """只提供OpenAIService初始化所需配置的假AI配置"""
+
+    def get_provider_config(self, provider):
+        return {"api_key": "test-key"}
+
+    def get_provider_models(self, provider):
+        return {}
+
+
+@pytest.fixture
+def service(monkeypatch):
+    monkeypatch.setattr(openai_service, "get_ai_settings", lambda: FakeAISettings())
+    return OpenAIService()
+
+
+def _redirecting_transport() -> httpx.MockTransport:
+    """生成结果URL先重定向到实际存储地址"""
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        if request.url.path == "/generated.png":
+            return httpx.Response(302, headers={"Location": "https://cdn.example.com/real.png"})
+        return httpx.Response(200, content=b"image-bytes")
+
+    return httpx.MockTransport(handler)
+
+
+class TestOpenAIHttpClient:
+    """测试复用的HTTP客户端"""
+
+    @pytest.mark.asyncio
+    async def test_download_follows_redirects(self, service):
+        """测试下载图像时跟随重定向"""
+        service._http._transport = _redirecting_transport()
+
+        encoded = await service._download_image_as_base64("https://files.example.com/generated.png")
+
+        assert base64.b64decode(encoded) == b"image-bytes"
+        await service.aclose()
+
+    def test_each_loop_keeps_its_own_client(self, service):
+        """测试在其他事件循环中使用时不替换当前循环的客户端，aclose关闭当前循环的客户端"""
+
+        async def get_client():
+            return service._http
+
+        loop = asyncio.new_event_loop()
+        try:
+            main_client = loop.run_until_complete(get_client())
+            other_client = asyncio.run(get_client())
+
+            assert other_client is not main_client
+            assert loop.run_until_complete(get_client()) is main_client
+
+            loop.run_until_complete(service.aclose())
+            assert main_client.is_closed
+        finally:
+            loop.close()
@@ -0,0 +1,168 @@
+# tests/test_replicate_batch.py
+import base64
+import pytest
+import sys
+from pathlib import Path
+
+from replicate.helpers import FileOutput
+
+# 确保可以导入src模块
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.application.services.external import replicate_service
+from src.application.services.external.replicate_service import ReplicateService
+
+SDXL = "stability-ai/sdxl:latest"
+MUSICGEN = "meta/musicgen:latest"
+
+
+class FakeAISettings:
+    """只提供ReplicateService初始化所需配置的假AI配置"""
+
+    def get_provider_config(self, provider):
+        return {"api_key": "test-token"}
+
+    def get_provider_models(self, provider):
+        return {
+            SDXL: {
+                "model_type": "image_generation",
+                "native_batch_param": "num_outputs",
+                "native_batch_max": 4
+            },
+            MUSICGEN: {"model_type": "audio_generation"}
+        }
+
+
+def _file_output(content: str) -> FileOutput:
+    """用data URL构造的文件输出，读取时不访问网络"""
+    encoded = base64.b64encode(content.encode()).decode("ascii")
+    return FileOutput(f"data:application/octet-stream;base64,{encoded}", None)
+
+
+class FakeReplicate:
+    """记录调用的假SDK客户端：输出为文件对象；原生批量调用按num_outputs返回结果，可指定少返回或失败的调用"""
+
+    def __init__(self, short_by: int = 0, failing_sizes: tuple = ()):
+        self.short_by = short_by
+        self.failing_sizes = failing_sizes
+        self.batch_calls = []
+        self.single_calls = 0
+
+    def run(self, model, input):
+        if "num_outputs" not in input:
+            self.single_calls += 1
+            return [_file_output(f"single_{self.single_calls}")]
+
+        size = input["num_outputs"]
+        self.batch_calls.append(size)
+        if size in self.failing_sizes:
+            raise RuntimeError(f"batch of {size} failed")
+        count = max(0, size - self.short_by)
+        return [_file_output(f"batch{len(self.batch_calls)}_{i}") for i in range(count)]
+
+
+def _decode(results):
+    return [base64.b64decode(result).decode() for result in results]
+
+
+@pytest.fixture
+def make_service(monkeypatch):
+    monkeypatch.setattr(replicate_service, "get_ai_settings", lambda: FakeAISettings())
+
+    def _make(fake: FakeReplicate) -> ReplicateService:
+        service = ReplicateService()
+        service.client = fake
+        return service
+
+    return _make
+
+
+class TestReplicateNativeBatch:
+    """测试原生批量推理的分批、缓存和失败语义"""
+
+    @pytest.mark.asyncio
+    async def test_batches_are_clamped_to_model_max(self, make_service):
+        """测试每次调用的输出数量不超过模型上限"""
+        fake = FakeReplicate()
+        service = make_service(fake)
+
+        results = await service.batch_inference(SDXL, {"prompt": "cat"}, 10)
+
+        assert sorted(fake.batch_calls) == [2, 4, 4]
+        assert len(results) == 10
+        assert fake.single_calls == 0
+
+    @pytest.mark.asyncio
+    async def test_short_batches_are_topped_up(self, make_service):
+        """测试模型少返回结果时用单次推理补齐"""
+        fake = FakeReplicate(short_by=1)
+        service = make_service(fake)
+
+        results = await service.batch_inference(SDXL, {"prompt": "cat"}, 6)
+
+        assert sorted(fake.batch_calls) == [2, 4]
+        assert fake.single_calls == 2
+        assert len(results) == 6
+        # 补齐的单次推理结果与批量结果一样是base64字符串
+        assert all(isinstance(result, str) for result in results)
+        assert sorted(_decode(results))[-2:] == ["single_1", "single_2"]
+
+    @pytest.mark.asyncio
+    async def test_failed_batch_only_drops_its_outputs(self, make_service):
+        """测试某一批失败只丢失该批的结果，与逐个调用时单个输出失败的语义一致"""
+        fake = FakeReplicate(failing_sizes=(2,))
+        service = make_service(fake)
+
+        results = await service.batch_inference(SDXL, {"prompt": "cat"}, 6)
+
+        assert len(results) == 4
+        assert fake.single_calls == 0
+
+    @pytest.mark.asyncio
+    async def test_cache_option_reuses_batch_result(self, make_service):
+        """测试_cache=True时相同的批量请求复用整批结果，且不修改调用方的输入"""
+        fake = FakeReplicate()
+        service = make_service(fake)
+        input_data = {"prompt": "cat", "_cache": True}
+
+        first = await service.batch_inference(SDXL, input_data, 3)
+        second = await service.batch_inference(SDXL, input_data, 3)
+
+        assert fake.batch_calls == [3]
+        assert first == second
+        assert input_data == {"prompt": "cat", "_cache": True}
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("model, num_outputs", [(SDXL, 8), (MUSICGEN, 3)])
+    async def test_cache_option_keeps_outputs_distinct(self, make_service, model, num_outputs):
+        """测试_cache=True时批内每个输出仍独立生成，不会返回同一结果的多份副本"""
+        fake = FakeReplicate()
+        service = make_service(fake)
+
+        results = await service.batch_inference(model, {"prompt": "cat", "_cache": True}, num_outputs)
+
+        assert len(results) == num_outputs
+        assert len(set(results)) == num_outputs
+
+    @pytest.mark.asyncio
+    async def test_models_without_native_batch_use_single_calls(self, make_service):
+        """测试未配置原生批量的模型逐个调用"""
+        fake = FakeReplicate()
+        service = make_service(fake)
+
+        results = await service.batch_inference(MUSICGEN, {"prompt": "piano"}, 3)
+
+        assert fake.batch_calls == []
+        assert fake.single_calls == 3
+        assert sorted(_decode(results)) == ["single_1", "single_2", "single_3"]
+
+    @pytest.mark.asyncio
+    async def test_file_list_output_returns_url_when_requested(self, make_service):
+        """测试单次推理的列表文件输出按_return_format返回URL"""
+        fake = FakeReplicate()
+        service = make_service(fake)
+
+        result = await service.run_inference(MUSICGEN, {"prompt": "piano", "_return_format": "url"})
+
+        assert result.startswith("data:")